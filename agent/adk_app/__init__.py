@@ -1,11 +1,16 @@
 """ADK planner package for the TableTalk dining assistant."""
 
+from .persistence import SessionStore, SnapshotFormatError, decode_snapshot, encode_snapshot
 from .planner import ConversationState, Observation, PlanResult, TableTalkPlanner, ToolCall
 
 __all__ = [
     "ConversationState",
     "Observation",
     "PlanResult",
+    "SessionStore",
+    "SnapshotFormatError",
     "TableTalkPlanner",
     "ToolCall",
+    "decode_snapshot",
+    "encode_snapshot",
 ]
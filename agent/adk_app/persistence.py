@@ -0,0 +1,488 @@
+"""Compact snapshot and delta persistence for ``ConversationState``.
+
+Rewriting the whole state on every turn costs more the longer the
+conversation runs. This module stores each session as an append-only log of
+length-prefixed binary records. The log starts with one full *snapshot* and
+then holds one *delta* per turn. A delta contains only:
+
+* preference keys that were set or removed, with list values that only grew
+  stored as an ``extend`` of the new tail;
+* observations appended to the history since the last write.
+
+``SessionStore.save`` compacts the log back into a single snapshot every
+``compact_every`` deltas, so rehydrating never replays a long tail.
+
+Record layout::
+
+    MAGIC (4) | version (1) | kind (1) | codec (1) | payload
+
+The payload is compact JSON, zlib-compressed once it grows past
+``COMPRESS_THRESHOLD``. Both steps run in the C-accelerated ``json`` and
+``zlib`` modules, which beat a hand-rolled pure-Python binary codec on both
+size and speed. The header lets readers reject records written with an
+unknown schema version.
+
+The store assumes one writer per session at a time, but successive turns
+may land on different workers: a worker whose view of the log is stale
+reloads it (see ``SessionStore.is_current``) rather than appending to it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .planner import ConversationState, Observation
+
+MAGIC = b"TTCS"
+VERSION = 1
+
+KIND_SNAPSHOT = 0x01
+KIND_DELTA = 0x02
+
+CODEC_JSON = 0x00
+CODEC_ZLIB_JSON = 0x01
+COMPRESS_THRESHOLD = 512
+
+_HEADER_LEN = len(MAGIC) + 3
+_ROLES = ("user", "assistant", "tool", "system")
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a record is truncated or has an unknown magic/version/kind."""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _pack(kind: int, payload: str) -> bytes:
+    data = payload.encode("utf-8")
+    codec = CODEC_JSON
+    if len(data) > COMPRESS_THRESHOLD:
+        data = zlib.compress(data, 1)
+        codec = CODEC_ZLIB_JSON
+    return MAGIC + bytes((VERSION, kind, codec)) + data
+
+
+def _unpack(buf: bytes, kind: int) -> Any:
+    if len(buf) < _HEADER_LEN or buf[: len(MAGIC)] != MAGIC:
+        raise SnapshotFormatError("not a TableTalk session record")
+    version, record_kind, codec = buf[len(MAGIC) : _HEADER_LEN]
+    if version != VERSION:
+        raise SnapshotFormatError(f"unsupported snapshot version {version}")
+    if record_kind != kind:
+        raise SnapshotFormatError(f"expected record kind {kind}, found {record_kind}")
+    data = buf[_HEADER_LEN:]
+    try:
+        if codec == CODEC_ZLIB_JSON:
+            data = zlib.decompress(data)
+        elif codec != CODEC_JSON:
+            raise SnapshotFormatError(f"unknown codec {codec}")
+        return json.loads(data)
+    except (zlib.error, ValueError) as exc:
+        if isinstance(exc, SnapshotFormatError):
+            raise
+        raise SnapshotFormatError(f"corrupt payload: {exc}") from exc
+
+
+def _observation_row(observation: Observation) -> List[Any]:
+    return [_ROLE_CODES[observation.role], observation.content, observation.tool_name]
+
+
+def _observation_from(raw: List[Any]) -> Observation:
+    try:
+        role_code, content, tool_name = raw
+        return Observation(role=_ROLES[role_code], content=content, tool_name=tool_name)
+    except (TypeError, ValueError, IndexError) as exc:
+        raise SnapshotFormatError(f"invalid observation {raw!r}") from exc
+
+
+# -- snapshots and deltas ---------------------------------------------------
+
+
+def encode_snapshot(state: ConversationState) -> bytes:
+    """Encode the full state as a schema-tagged snapshot record."""
+
+    history = [_observation_row(observation) for observation in state.history]
+    return _pack(KIND_SNAPSHOT, _dumps({"p": state.preferences, "h": history}))
+
+
+def decode_snapshot(buf: bytes) -> ConversationState:
+    payload = _unpack(buf, KIND_SNAPSHOT)
+    return ConversationState(
+        preferences=payload["p"],
+        history=[_observation_from(raw) for raw in payload["h"]],
+    )
+
+
+@dataclass
+class _Persisted:
+    """What the last written record already covers, used to diff the next turn."""
+
+    history_len: int = 0
+    encoded: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, state: ConversationState) -> "_Persisted":
+        return cls(
+            history_len=len(state.history),
+            encoded={key: _dumps(value) for key, value in state.preferences.items()},
+        )
+
+
+def _extension(previous: str, current: str) -> Optional[str]:
+    """Return the JSON of appended items if ``current`` only extends ``previous``.
+
+    Works on the encoded form, so it needs no second encoding pass:
+    ``[a,b]`` extended to ``[a,b,c]`` shares the ``[a,b`` prefix.
+    """
+
+    if not (previous.startswith("[") and current.startswith("[")):
+        return None
+    if previous == "[]":
+        return current
+    stem = previous[:-1]
+    if len(current) > len(previous) and current.startswith(stem) and current[len(stem)] == ",":
+        return "[" + current[len(stem) + 1 :]
+    return None
+
+
+def encode_delta(state: ConversationState, persisted: _Persisted) -> Optional[bytes]:
+    """Encode changes since ``persisted`` and advance it; ``None`` if nothing changed."""
+
+    sets: List[str] = []
+    extends: List[str] = []
+    for key, value in state.preferences.items():
+        encoded = _dumps(value)
+        previous = persisted.encoded.get(key)
+        if previous == encoded:
+            continue
+        tail = _extension(previous, encoded) if previous is not None else None
+        if tail is not None:
+            extends.append(f"{_dumps(key)}:{tail}")
+        else:
+            sets.append(f"{_dumps(key)}:{encoded}")
+        persisted.encoded[key] = encoded
+
+    deleted = [key for key in persisted.encoded if key not in state.preferences]
+    for key in deleted:
+        del persisted.encoded[key]
+
+    new_observations = state.history[persisted.history_len :]
+    if not sets and not extends and not deleted and not new_observations:
+        return None
+
+    history = _dumps([_observation_row(observation) for observation in new_observations])
+    payload = (
+        f'{{"b":{persisted.history_len},"s":{{{",".join(sets)}}},"x":{{{",".join(extends)}}},'
+        f'"d":{_dumps(deleted)},"h":{history}}}'
+    )
+    persisted.history_len = len(state.history)
+    return _pack(KIND_DELTA, payload)
+
+
+def apply_delta(state: ConversationState, buf: bytes) -> None:
+    """Apply a delta record to ``state`` in place."""
+
+    payload = _unpack(buf, KIND_DELTA)
+    if payload["b"] != len(state.history):
+        raise SnapshotFormatError(f"delta expects {payload['b']} history entries, state has {len(state.history)}")
+    state.preferences.update(payload["s"])
+    for key, tail in payload["x"].items():
+        state.preferences.setdefault(key, []).extend(tail)
+    for key in payload["d"]:
+        state.preferences.pop(key, None)
+    state.history.extend(_observation_from(raw) for raw in payload["h"])
+
+
+# -- on-disk log ------------------------------------------------------------
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        if pos >= len(buf):
+            raise SnapshotFormatError("truncated varint")
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _frame(record: bytes) -> bytes:
+    out = bytearray()
+    _write_varint(out, len(record))
+    out += record
+    return bytes(out)
+
+
+def _iter_records(buf: bytes) -> Tuple[List[bytes], bool]:
+    """Split a log into records; the flag is ``True`` if the tail was torn."""
+
+    records: List[bytes] = []
+    pos = 0
+    while pos < len(buf):
+        try:
+            length, pos = _read_varint(buf, pos)
+        except SnapshotFormatError:
+            return records, True
+        if pos + length > len(buf):
+            # A torn final append: ignore it, the previous records are intact.
+            return records, True
+        records.append(buf[pos : pos + length])
+        pos += length
+    return records, False
+
+
+LogStamp = Tuple[int, int, int]
+
+
+def _stamp(path: Path) -> Optional[LogStamp]:
+    try:
+        info = path.stat()
+    except FileNotFoundError:
+        return None
+    return info.st_ino, info.st_size, info.st_mtime_ns
+
+
+class SessionStore:
+    """Directory of per-session append-only logs.
+
+    Each store remembers the ``(inode, size, mtime)`` stamp of every log it
+    last read or wrote. If another worker has appended to or compacted the
+    log since then, ``is_current`` returns ``False`` and ``save`` rewrites the
+    log as a snapshot instead of appending a delta against stale history.
+    ``load`` keeps the longest valid prefix of a damaged or torn log and marks
+    it for compaction.
+
+    Parameters
+    ----------
+    root:
+        Directory holding one ``<session_id>.ttcs`` file per session.
+    compact_every:
+        Number of deltas after which the log is rewritten as a single
+        snapshot.
+    """
+
+    SUFFIX = ".ttcs"
+
+    def __init__(self, root: Path, compact_every: int = 32) -> None:
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._compact_every = compact_every
+        self._persisted: Dict[str, _Persisted] = {}
+        self._deltas: Dict[str, int] = {}
+        self._stamps: Dict[str, Optional[LogStamp]] = {}
+
+    def _path(self, session_id: str) -> Path:
+        if not session_id or os.sep in session_id or (os.altsep and os.altsep in session_id) or session_id in (".", ".."):
+            raise ValueError(f"invalid session id {session_id!r}")
+        return self._root / f"{session_id}{self.SUFFIX}"
+
+    def is_current(self, session_id: str) -> bool:
+        """Whether the on-disk log is exactly what this store last read or wrote."""
+
+        return self._stamps.get(session_id) == _stamp(self._path(session_id))
+
+    def load(self, session_id: str) -> Optional[ConversationState]:
+        """Rehydrate a session, or return ``None`` if it was never saved.
+
+        Raises ``SnapshotFormatError`` if the leading snapshot is unreadable.
+        """
+
+        path = self._path(session_id)
+        self._forget(session_id)
+        if not path.exists():
+            return None
+        stamp = _stamp(path)
+        records, torn = _iter_records(path.read_bytes())
+        if not records:
+            return None
+        state = decode_snapshot(records[0])
+        applied = 0
+        damaged = torn
+        for record in records[1:]:
+            try:
+                apply_delta(state, record)
+            except SnapshotFormatError:
+                damaged = True
+                break
+            applied += 1
+        self._persisted[session_id] = _Persisted.of(state)
+        # Keep the valid prefix and force the next save to rewrite the log:
+        # a delta appended after torn or bad bytes would be unreadable.
+        self._deltas[session_id] = self._compact_every if damaged else applied
+        self._stamps[session_id] = stamp
+        return state
+
+    def save(self, session_id: str, state: ConversationState) -> int:
+        """Persist what changed since the last save; return bytes written."""
+
+        persisted = self._persisted.get(session_id)
+        if (
+            persisted is None
+            or self._deltas.get(session_id, 0) >= self._compact_every
+            or not self.is_current(session_id)
+        ):
+            return self.compact(session_id, state)
+        delta = encode_delta(state, persisted)
+        if delta is None:
+            return 0
+        framed = _frame(delta)
+        path = self._path(session_id)
+        with path.open("ab") as sink:
+            sink.write(framed)
+        self._deltas[session_id] += 1
+        self._stamps[session_id] = _stamp(path)
+        return len(framed)
+
+    def compact(self, session_id: str, state: ConversationState) -> int:
+        """Atomically replace the session log with a single snapshot."""
+
+        path = self._path(session_id)
+        framed = _frame(encode_snapshot(state))
+        tmp = path.with_suffix(self.SUFFIX + ".tmp")
+        tmp.write_bytes(framed)
+        os.replace(tmp, path)
+        self._persisted[session_id] = _Persisted.of(state)
+        self._deltas[session_id] = 0
+        self._stamps[session_id] = _stamp(path)
+        return len(framed)
+
+    def delete(self, session_id: str) -> None:
+        self._path(session_id).unlink(missing_ok=True)
+        self._forget(session_id)
+
+    def _forget(self, session_id: str) -> None:
+        self._persisted.pop(session_id, None)
+        self._deltas.pop(session_id, None)
+        self._stamps.pop(session_id, None)
+
+
+# -- benchmark --------------------------------------------------------------
+
+
+def _state_to_json(state: ConversationState) -> str:
+    return json.dumps(
+        {
+            "preferences": state.preferences,
+            "history": [
+                {"role": obs.role, "content": obs.content, "tool_name": obs.tool_name} for obs in state.history
+            ],
+        }
+    )
+
+
+def _json_to_state(encoded: str) -> ConversationState:
+    decoded = json.loads(encoded)
+    return ConversationState(
+        preferences=decoded["preferences"],
+        history=[Observation(**item) for item in decoded["history"]],
+    )
+
+
+def _simulate_turn(state: ConversationState, turn: int) -> None:
+    from agent.tools import MenuLookupTool, PlacesSearchTool
+
+    places = PlacesSearchTool().search(near="94105")
+    state.ingest_observation(Observation(role="user", content=f"Turn {turn}: anything vegan nearby?"))
+    state.ingest_observation(Observation(role="tool", content=places, tool_name="places.search"))
+    state.ingest_observation(
+        Observation(role="tool", content=MenuLookupTool().lookup("demo-ramen"), tool_name="menus.lookup")
+    )
+    state.ingest_observation(Observation(role="assistant", content="Here are a few options."))
+    state.preferences["budget"] = 20 + turn % 3
+
+
+def _bench(turns: int, root: Path) -> Dict[str, float]:
+    """Compare against plain JSON and JSON+zlib (same level as the store).
+
+    The synthetic session repeats the same tool results every turn, so
+    compression ratios here are far better than on real traffic; the
+    ``json_zlib_*`` rows isolate what the delta log itself saves.
+    """
+
+    state = ConversationState(preferences={"diet": ["vegan"], "location": "94105", "distance_km": 3})
+    store = SessionStore(root, compact_every=32)
+    json_bytes = json_zlib_bytes = delta_bytes = 0
+    for turn in range(turns):
+        _simulate_turn(state, turn)
+        encoded = _state_to_json(state).encode("utf-8")
+        json_bytes += len(encoded)
+        json_zlib_bytes += len(zlib.compress(encoded, 1))
+        delta_bytes += store.save("bench", state)
+
+    iterations = 200
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded_json = _state_to_json(state)
+    json_encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _json_to_state(encoded_json)
+    json_decode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded_json_zlib = zlib.compress(_state_to_json(state).encode("utf-8"), 1)
+    json_zlib_encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _json_to_state(zlib.decompress(encoded_json_zlib).decode("utf-8"))
+    json_zlib_decode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded_bin = encode_snapshot(state)
+    bin_encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_snapshot(encoded_bin)
+    bin_decode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rehydrated = SessionStore(root).load("bench")
+    load_s = time.perf_counter() - start
+    assert rehydrated is not None and encode_snapshot(rehydrated) == encode_snapshot(state)
+
+    return {
+        "turns": turns,
+        "json_full_rewrite_bytes_per_turn": json_bytes / turns,
+        "json_zlib_full_rewrite_bytes_per_turn": json_zlib_bytes / turns,
+        "delta_log_bytes_per_turn": delta_bytes / turns,
+        "json_snapshot_bytes": len(encoded_json),
+        "json_zlib_snapshot_bytes": len(encoded_json_zlib),
+        "binary_snapshot_bytes": len(encoded_bin),
+        "json_encode_per_s": iterations / json_encode_s,
+        "json_decode_per_s": iterations / json_decode_s,
+        "json_zlib_encode_per_s": iterations / json_zlib_encode_s,
+        "json_zlib_decode_per_s": iterations / json_zlib_decode_s,
+        "binary_encode_per_s": iterations / bin_encode_s,
+        "binary_decode_per_s": iterations / bin_decode_s,
+        "rehydrate_ms": load_s * 1000,
+    }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark session snapshot/delta persistence.")
+    parser.add_argument("--turns", type=int, default=100)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(json.dumps(_bench(args.turns, Path(tmp)), indent=2))
@@ -19,8 +19,9 @@ when wiring the real runtime.
 from __future__ import annotations
 
 import argparse
+import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Sequence
 
 
 ObservationRole = Literal["user", "assistant", "tool", "system"]
@@ -99,6 +100,15 @@ class ConversationState:
             # agent runner can plug in an NLU step later.
             self.preferences.setdefault("last_user_message", observation.content)
 
+        if observation.role == "tool" and observation.tool_name == "places.search":
+            # A fresh search replaces the shortlist, so menus fetched for the
+            # previous shortlist no longer apply.
+            if isinstance(observation.content, list):
+                self.preferences["candidates"] = [
+                    item["place_id"] for item in observation.content if isinstance(item, dict) and "place_id" in item
+                ]
+                self.preferences.pop("menus_cache", None)
+
         if observation.role == "tool" and observation.tool_name == "menus.lookup":
             # Demonstrate how tool results could refresh the state (best
             # practice: normalise lookups to avoid repeated calls).
@@ -126,6 +136,11 @@ class ConversationState:
 class TableTalkPlanner:
     """Google ADK-style planner placeholder."""
 
+    # Number of shortlisted places whose menus are fetched on the follow-up turn.
+    MENU_FANOUT = 3
+    # Follow-ups that ask about the shortlist's food rather than for a new search.
+    MENU_QUESTION = re.compile(r"\b(menus?|dish(es)?|serve[sd]?|serving)\b", re.IGNORECASE)
+
     def __init__(self) -> None:
         self._critic_enabled = True
 
@@ -145,6 +160,19 @@ class TableTalkPlanner:
             question = self._build_clarifying_question(missing)
             return PlanResult(response=question, tool_calls=[])
 
+        candidates = state.preferences.get("candidates")
+        asks_for_menus = isinstance(observation.content, str) and self.MENU_QUESTION.search(observation.content)
+        if candidates and asks_for_menus and not state.preferences.get("menus_cache"):
+            tool_calls = [
+                ToolCall(
+                    name="menus.lookup",
+                    arguments={"place_id": place_id},
+                    description="Menu details for a shortlisted restaurant",
+                )
+                for place_id in candidates[: self.MENU_FANOUT]
+            ]
+            return PlanResult(response="Here's what's on the menu at the top picks.", tool_calls=tool_calls)
+
         tool_calls = [
             ToolCall(
                 name="places.search",
@@ -160,17 +188,45 @@ class TableTalkPlanner:
     ) -> List[Dict[str, Any]]:
         """Filter suggestions that violate price or dietary constraints."""
 
+        accept = self._critic_predicate(preferences)
+        return [item for item in suggestions if accept(item)]
+
+    def critic_score_batch(
+        self,
+        suggestion_batches: Sequence[Sequence[Dict[str, Any]]],
+        preferences_batch: Sequence[Dict[str, Any]],
+    ) -> List[float]:
+        """Score many suggestion lists at once as the fraction passing the critic.
+
+        Predicates are compiled once per distinct preference set, so scoring a
+        large offline batch does not rebuild the dietary sets per item. Empty
+        suggestion lists score ``0.0``.
+        """
+
+        if len(suggestion_batches) != len(preferences_batch):
+            raise ValueError("suggestion_batches and preferences_batch must have the same length")
+
+        predicates: Dict[Any, Callable[[Dict[str, Any]], bool]] = {}
+        scores: List[float] = []
+        for suggestions, preferences in zip(suggestion_batches, preferences_batch):
+            key = (preferences.get("budget"), tuple(preferences.get("diet", [])))
+            accept = predicates.get(key)
+            if accept is None:
+                accept = predicates[key] = self._critic_predicate(preferences)
+            scores.append(sum(map(accept, suggestions)) / len(suggestions) if suggestions else 0.0)
+        return scores
+
+    @staticmethod
+    def _critic_predicate(preferences: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
         max_price = preferences.get("budget")
         dietary = set(map(str.lower, preferences.get("diet", [])))
 
-        filtered: List[Dict[str, Any]] = []
-        for item in suggestions:
-            price_ok = max_price is None or item.get("price", 0) <= max_price
-            tags = set(map(str.lower, item.get("tags", [])))
-            diet_ok = not dietary or dietary.issubset(tags)
-            if price_ok and diet_ok:
-                filtered.append(item)
-        return filtered
+        def accept(item: Dict[str, Any]) -> bool:
+            if max_price is not None and item.get("price", 0) > max_price:
+                return False
+            return not dietary or dietary.issubset(map(str.lower, item.get("tags", [])))
+
+        return accept
 
     @staticmethod
     def _build_clarifying_question(missing: Sequence[str]) -> str:
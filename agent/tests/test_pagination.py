@@ -0,0 +1,57 @@
+"""Tests for cursor pagination on the search tools."""
+
+import pytest
+
+from agent.tools import MenuLookupTool, PlacesSearchTool
+
+CATALOGUE = [
+    {
+        "place_id": f"p{index:03d}",
+        "name": f"Place {index}",
+        "cuisines": ["japanese"],
+        "tags": ["vegan"] if index % 2 else ["vegetarian"],
+        "price_level": 1,
+        "distance_km": float(index % 7),
+    }
+    for index in range(50)
+]
+
+
+def test_pages_cover_full_results_in_stable_order() -> None:
+    tool = PlacesSearchTool(CATALOGUE)
+    full = tool.search(near="94105", dietary=["vegan"], distance_km=4)
+
+    pages = [tool.search_page(near="94105", dietary=["vegan"], distance_km=4, page_size=4)]
+    while pages[-1]["next_cursor"] is not None:
+        cursor = pages[-1]["next_cursor"]
+        pages.append(tool.search_page(near="94105", dietary=["vegan"], distance_km=4, page_size=4, cursor=cursor))
+
+    assert [item for page in pages for item in page["items"]] == full
+    assert all(len(page["items"]) == 4 for page in pages[:-1])
+    assert pages[-1]["next_cursor"] is None
+    assert [(p["distance_km"], p["place_id"]) for p in full] == sorted((p["distance_km"], p["place_id"]) for p in full)
+
+
+def test_cursor_resumes_statelessly_and_rejects_garbage() -> None:
+    first = PlacesSearchTool(CATALOGUE).search_page(near="94105", page_size=5)
+    second = PlacesSearchTool(CATALOGUE).search_page(near="94105", page_size=5, cursor=first["next_cursor"])
+
+    assert not {p["place_id"] for p in first["items"]} & {p["place_id"] for p in second["items"]}
+    with pytest.raises(ValueError):
+        PlacesSearchTool().search_page(near="94105", cursor="not-a-cursor")
+
+
+def test_menu_lookup_pages_stay_within_place() -> None:
+    items = [
+        {"place_id": "demo-ramen", "item_id": f"extra-{index}", "name": "Side", "price": 3.0, "tags": [], "cuisine": []}
+        for index in range(5)
+    ]
+    tool = MenuLookupTool(items)
+
+    first = tool.lookup_page("demo-ramen", page_size=4)
+    rest = tool.lookup_page("demo-ramen", page_size=4, cursor=first["next_cursor"])
+
+    assert len(first["items"]) + len(rest["items"]) == len(tool.lookup("demo-ramen")) == 6
+    assert rest["next_cursor"] is None
+    with pytest.raises(ValueError):
+        tool.lookup_page("demo-pizza", cursor=first["next_cursor"])
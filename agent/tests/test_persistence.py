@@ -0,0 +1,97 @@
+"""Tests for compact ConversationState snapshots and delta logs."""
+
+import pytest
+
+from agent.adk_app import ConversationState, Observation, SessionStore, SnapshotFormatError, decode_snapshot, encode_snapshot
+
+
+def _turn(state: ConversationState, index: int) -> None:
+    state.ingest_observation(Observation(role="user", content=f"turn {index}"))
+    state.ingest_observation(
+        Observation(role="tool", content=[{"place_id": "demo-ramen", "price": 16.5}], tool_name="menus.lookup")
+    )
+    state.preferences["budget"] = index
+
+
+def test_snapshot_round_trip() -> None:
+    state = ConversationState(preferences={"diet": ["vegan"], "budget": 20, "note": "ünïcode"})
+    _turn(state, 1)
+
+    restored = decode_snapshot(encode_snapshot(state))
+
+    assert restored.preferences == state.preferences
+    assert restored.history == state.history
+
+
+def test_deltas_write_only_changes_and_rehydrate(tmp_path) -> None:
+    store = SessionStore(tmp_path, compact_every=100)
+    state = ConversationState(preferences={"diet": ["vegan"], "location": "94105"})
+    store.save("s", state)
+
+    sizes = []
+    for index in range(20):
+        _turn(state, index)
+        sizes.append(store.save("s", state))
+    state.preferences.pop("location")
+    store.save("s", state)
+
+    assert store.save("s", state) == 0
+    # menus_cache grows every turn, but deltas only carry the new tail.
+    assert max(sizes[5:]) <= sizes[1] + 8
+    restored = SessionStore(tmp_path).load("s")
+    assert restored is not None
+    assert restored.preferences == state.preferences
+    assert restored.history == state.history
+
+
+def test_compaction_rewrites_log_as_snapshot(tmp_path) -> None:
+    store = SessionStore(tmp_path, compact_every=3)
+    state = ConversationState()
+    for index in range(7):
+        _turn(state, index)
+        store.save("s", state)
+
+    worker = SessionStore(tmp_path, compact_every=3)
+    restored = worker.load("s")
+    assert restored is not None and restored.history == state.history
+    _turn(restored, 7)
+    worker.save("s", restored)
+    assert SessionStore(tmp_path).load("s").history == restored.history  # type: ignore[union-attr]
+
+
+def test_rejects_unknown_version_and_ignores_torn_tail(tmp_path) -> None:
+    record = bytearray(encode_snapshot(ConversationState(preferences={"a": 1})))
+    record[4] = 99
+    with pytest.raises(SnapshotFormatError):
+        decode_snapshot(bytes(record))
+
+    store = SessionStore(tmp_path)
+    state = ConversationState(preferences={"a": 1})
+    store.save("s", state)
+    state.preferences["a"] = 2
+    store.save("s", state)
+    path = tmp_path / "s.ttcs"
+    path.write_bytes(path.read_bytes()[:-2])
+
+    assert SessionStore(tmp_path).load("s").preferences == {"a": 1}  # type: ignore[union-attr]
+
+
+def test_save_after_torn_tail_is_not_lost(tmp_path) -> None:
+    store = SessionStore(tmp_path)
+    state = ConversationState(preferences={"a": 1})
+    store.save("s", state)
+    state.preferences["a"] = 2
+    store.save("s", state)
+    path = tmp_path / "s.ttcs"
+    path.write_bytes(path.read_bytes()[:-2])
+
+    worker = SessionStore(tmp_path)
+    restored = worker.load("s")
+    assert restored is not None
+    _turn(restored, 3)
+    worker.save("s", restored)
+
+    reloaded = SessionStore(tmp_path).load("s")
+    assert reloaded is not None
+    assert reloaded.preferences == restored.preferences
+    assert reloaded.history == restored.history
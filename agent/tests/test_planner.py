@@ -31,3 +31,57 @@ def test_plan_enqueues_places_search_when_preferences_present() -> None:
 
     assert result.tool_calls, "Expected tool queue with places.search call"
     assert result.tool_calls[0].name == "places.search"
+
+
+def test_plan_looks_up_menus_for_shortlist_after_search() -> None:
+    planner = TableTalkPlanner()
+    state = ConversationState(
+        preferences={
+            "diet": ["vegan"],
+            "budget": 25,
+            "distance_km": 5,
+            "location": "94105",
+        }
+    )
+    state.ingest_observation(
+        Observation(role="tool", content=[{"place_id": "demo-ramen"}], tool_name="places.search")
+    )
+
+    result = planner.plan(Observation(role="user", content="What do they serve?"), state)
+
+    assert [call.name for call in result.tool_calls] == ["menus.lookup"]
+    assert result.tool_calls[0].arguments == {"place_id": "demo-ramen"}
+
+
+def test_plan_searches_again_when_follow_up_is_not_about_menus() -> None:
+    planner = TableTalkPlanner()
+    state = ConversationState(
+        preferences={
+            "diet": ["vegan"],
+            "budget": 25,
+            "distance_km": 5,
+            "location": "94105",
+        }
+    )
+    state.ingest_observation(
+        Observation(role="tool", content=[{"place_id": "demo-ramen"}], tool_name="places.search")
+    )
+
+    result = planner.plan(Observation(role="user", content="Anything cheaper?"), state)
+
+    assert [call.name for call in result.tool_calls] == ["places.search"]
+
+
+def test_critic_score_batch_matches_critic_filter() -> None:
+    planner = TableTalkPlanner()
+    suggestions = [
+        [{"price": 12, "tags": ["Vegan"]}, {"price": 30, "tags": ["vegan"]}],
+        [{"price": 12, "tags": ["spicy"]}],
+        [],
+    ]
+    preferences = [{"budget": 20, "diet": ["vegan"]}, {"budget": 20, "diet": ["vegan"]}, {}]
+
+    scores = planner.critic_score_batch(suggestions, preferences)
+
+    assert scores == [0.5, 0.0, 0.0]
+    assert planner.critic_filter(suggestions[0], preferences[0]) == [suggestions[0][0]]
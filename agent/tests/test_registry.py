@@ -0,0 +1,74 @@
+"""Unit tests for the declarative tool registry."""
+
+import json
+
+import pytest
+
+from agent.tools import ArgSpec, ToolRegistry, ToolSpec, ToolValidationError, build_default_registry
+
+
+def test_dispatch_runs_handler_and_encodes_result() -> None:
+    registry = build_default_registry()
+
+    result = registry.dispatch("menus.lookup", {"place_id": "demo-ramen"})
+
+    assert result.name == "menus.lookup"
+    assert result.data and result.data[0]["item_id"] == "miso-vegan"
+    event = json.loads(result.encode())
+    assert event == {"type": "tool_result", "name": "menus.lookup", "data": result.data}
+    assert result.encode() is result.encode()
+
+
+def test_dispatch_page_uses_the_declared_pager() -> None:
+    registry = build_default_registry()
+
+    first = registry.dispatch_page("places.search", {"near": "94105"}, page_size=1)
+    second = registry.dispatch_page("places.search", {"near": "94105"}, page_size=1, cursor=first.next_cursor)
+
+    assert [item["place_id"] for item in first.data + second.data] == ["demo-pizza", "demo-ramen"]
+    assert second.next_cursor is None
+    with pytest.raises(ToolValidationError):
+        registry.dispatch_page("book.deeplink", {}, page_size=1)
+
+
+@pytest.mark.parametrize(
+    "name, arguments",
+    [
+        ("menus.lookup", {}),
+        ("menus.lookup", {"place_id": 7}),
+        ("menus.lookup", {"place_id": "demo-ramen", "extra": True}),
+        ("places.search", {"near": "94105", "max_price": True}),
+        ("places.search", {"near": "94105", "dietary": ["vegan", 3]}),
+        ("book.deeplink", {"place_id": "demo-ramen", "party_size": 2, "datetime_iso": "tonight"}),
+        ("unknown.tool", {}),
+    ],
+)
+def test_malformed_calls_are_rejected_before_backend(name: str, arguments: dict) -> None:
+    registry = build_default_registry()
+
+    with pytest.raises(ToolValidationError):
+        registry.dispatch(name, arguments)
+
+
+def test_float_arguments_accept_ints_and_optional_nulls() -> None:
+    calls = []
+    registry = ToolRegistry(
+        [
+            ToolSpec(
+                name="echo",
+                handler=lambda **kwargs: calls.append(kwargs) or kwargs,
+                args=(ArgSpec("value", float), ArgSpec("note", str, required=False, nullable=True)),
+            )
+        ]
+    )
+
+    assert registry.dispatch("echo", {"value": 3, "note": None}).data == {"value": 3, "note": None}
+    assert calls == [{"value": 3, "note": None}]
+
+
+def test_duplicate_registration_is_an_error() -> None:
+    spec = ToolSpec(name="noop", handler=lambda: None)
+    registry = ToolRegistry([spec])
+
+    with pytest.raises(ValueError):
+        registry.register(spec)
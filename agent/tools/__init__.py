@@ -3,5 +3,16 @@
 from .places import PlacesSearchTool
 from .menus import MenuLookupTool
 from .booking import BookingTools
+from .registry import ArgSpec, ToolRegistry, ToolResult, ToolSpec, ToolValidationError, build_default_registry
 
-__all__ = ["PlacesSearchTool", "MenuLookupTool", "BookingTools"]
+__all__ = [
+    "PlacesSearchTool",
+    "MenuLookupTool",
+    "BookingTools",
+    "ArgSpec",
+    "ToolRegistry",
+    "ToolResult",
+    "ToolSpec",
+    "ToolValidationError",
+    "build_default_registry",
+]
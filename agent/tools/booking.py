@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict
 
 
@@ -22,8 +23,8 @@ class BookingTools:
     def create_calendar_event(self, title: str, start_iso: str, end_iso: str, location: str) -> Dict[str, str]:
         """Mock calendar event creation."""
 
-        _validate_iso(start_iso)
-        _validate_iso(end_iso)
+        parse_iso(start_iso)
+        parse_iso(end_iso)
         return {
             "title": title,
             "start_iso": start_iso,
@@ -33,5 +34,8 @@ class BookingTools:
         }
 
 
-def _validate_iso(value: str) -> None:
-    datetime.fromisoformat(value.replace("Z", "+00:00"))
+@lru_cache(maxsize=1024)
+def parse_iso(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp, memoised so repeated slots are parsed once."""
+
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
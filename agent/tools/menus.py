@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from .pagination import DEFAULT_PAGE_SIZE, decode_cursor, paginate, seek
+
 
 @dataclass
 class MenuItem:
@@ -40,17 +43,42 @@ class MenuLookupTool:
         ]
         if items:
             self._items.extend(MenuItem(**item) for item in items)
+        # Ordered by (place_id, item_id) so a lookup seeks straight to its place
+        # and pagination cursors are stable.
+        self._ordered = sorted(self._items, key=lambda item: (item.place_id, item.item_id))
+        self._keys = [(item.place_id, item.item_id) for item in self._ordered]
 
     def lookup(self, place_id: str) -> List[Dict[str, Any]]:
-        return [
-            {
-                "place_id": item.place_id,
-                "item_id": item.item_id,
-                "name": item.name,
-                "price": item.price,
-                "tags": item.tags,
-                "cuisine": item.cuisine,
-            }
-            for item in self._items
-            if item.place_id == place_id
-        ]
+        return self.lookup_page(place_id, page_size=len(self._ordered) or 1)["items"]
+
+    def lookup_page(
+        self, place_id: str, page_size: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Return ``{"items": [...], "next_cursor": str | None}`` for one page."""
+
+        if cursor is None:
+            start = bisect_left(self._keys, (place_id,))
+        else:
+            if decode_cursor(cursor)[0] != place_id:
+                raise ValueError(f"cursor {cursor!r} belongs to a different place")
+            start = seek(self._keys, cursor)
+        return paginate(
+            self._ordered,
+            self._keys,
+            start,
+            page_size,
+            accept=lambda item: True,
+            render=_render,
+            stop=lambda item: item.place_id != place_id,
+        )
+
+
+def _render(item: MenuItem) -> Dict[str, Any]:
+    return {
+        "place_id": item.place_id,
+        "item_id": item.item_id,
+        "name": item.name,
+        "price": item.price,
+        "tags": item.tags,
+        "cuisine": item.cuisine,
+    }
@@ -0,0 +1,128 @@
+"""Keyset (cursor) pagination shared by the search-style tools.
+
+Tools keep their rows sorted by a stable key and hand out an opaque cursor
+that encodes the key of the last row on the page. Resuming is a ``bisect``
+into the sorted keys, so cursors stay valid across workers and requests and
+rows inserted ahead of a cursor do not shift later pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import time
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+SortKey = Tuple[Any, ...]
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def encode_cursor(key: SortKey) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Decode a cursor produced by ``encode_cursor``; raise ``ValueError`` if malformed."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError(f"invalid cursor {cursor!r}") from exc
+    if not isinstance(decoded, list) or not decoded:
+        raise ValueError(f"invalid cursor {cursor!r}")
+    return tuple(decoded)
+
+
+def seek(keys: Sequence[SortKey], cursor: Optional[str]) -> int:
+    """Return the index of the first row after ``cursor``."""
+
+    if cursor is None:
+        return 0
+    key = decode_cursor(cursor)
+    try:
+        return bisect_right(keys, key)
+    except TypeError as exc:
+        raise ValueError(f"cursor {cursor!r} does not match this result set") from exc
+
+
+def paginate(
+    rows: Sequence[T],
+    keys: Sequence[SortKey],
+    start: int,
+    page_size: int,
+    accept: Callable[[T], bool],
+    render: Callable[[T], Dict[str, Any]],
+    stop: Optional[Callable[[T], bool]] = None,
+) -> Dict[str, Any]:
+    """Collect one page of accepted rows starting at ``start``.
+
+    Scanning ends as soon as the page is full and one more match is seen, so
+    the first page costs time proportional to the page, not the result set.
+    ``next_cursor`` is ``None`` on the last page.
+    """
+
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+    items = []
+    last = start
+    for index in range(start, len(rows)):
+        row = rows[index]
+        if stop is not None and stop(row):
+            break
+        if not accept(row):
+            continue
+        if len(items) == page_size:
+            return {"items": items, "next_cursor": encode_cursor(keys[last])}
+        items.append(render(row))
+        last = index
+    return {"items": items, "next_cursor": None}
+
+
+def _bench(places: int, page_size: int) -> Dict[str, float]:
+    """Compare the full result list against the first page on a large catalogue."""
+
+    from .places import PlacesSearchTool
+
+    catalogue = [
+        {
+            "place_id": f"place-{index:06d}",
+            "name": f"Place {index}",
+            "cuisines": ["japanese" if index % 2 else "italian"],
+            "tags": ["vegan", "spicy"] if index % 3 else ["vegetarian"],
+            "price_level": 1 + index % 3,
+            "distance_km": round((index * 7919 % 10000) / 1000, 3),
+        }
+        for index in range(places)
+    ]
+    tool = PlacesSearchTool(catalogue)
+
+    start = time.perf_counter()
+    full = json.dumps(tool.search(near="94105"))
+    full_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first = json.dumps(tool.search_page(near="94105", page_size=page_size)["items"])
+    page_s = time.perf_counter() - start
+
+    return {
+        "places": places,
+        "page_size": page_size,
+        "full_time_to_first_result_ms": full_s * 1000,
+        "paged_time_to_first_result_ms": page_s * 1000,
+        "full_payload_bytes": len(full),
+        "first_page_payload_bytes": len(first),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark paginated vs full search results.")
+    parser.add_argument("--places", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    args = parser.parse_args()
+    print(json.dumps(_bench(args.places, args.page_size), indent=2))
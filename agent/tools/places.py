@@ -5,6 +5,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional
 
+from .pagination import DEFAULT_PAGE_SIZE, paginate, seek
+
 
 @dataclass
 class Place:
@@ -21,7 +23,9 @@ class PlacesSearchTool:
 
     Replace the `_catalogue` loader with a connector to Google Places, Yelp, or
     another local search provider. The `search` method mirrors the JSON schema
-    included in the project blueprint.
+    included in the project blueprint. Results are ordered by
+    ``(distance_km, place_id)``, which is also the key behind the cursors
+    returned by `search_page`.
     """
 
     def __init__(self, catalogue: Optional[Iterable[Dict[str, Any]]] = None) -> None:
@@ -45,6 +49,8 @@ class PlacesSearchTool:
         ]
         if catalogue:
             self._catalogue.extend(Place(**item) for item in catalogue)
+        self._ordered = sorted(self._catalogue, key=lambda place: (place.distance_km, place.place_id))
+        self._keys = [(place.distance_km, place.place_id) for place in self._ordered]
 
     def search(
         self,
@@ -54,28 +60,45 @@ class PlacesSearchTool:
         max_price: Optional[float] = None,
         distance_km: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
+        page = self.search_page(near, cuisines, dietary, max_price, distance_km, page_size=len(self._ordered) or 1)
+        return page["items"]
+
+    def search_page(
+        self,
+        near: str,
+        cuisines: Optional[List[str]] = None,
+        dietary: Optional[List[str]] = None,
+        max_price: Optional[float] = None,
+        distance_km: Optional[float] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return ``{"items": [...], "next_cursor": str | None}`` for one page."""
+
         del near  # geo filtering mocked out
-        cuisines = [c.lower() for c in cuisines or []]
-        dietary = {d.lower() for d in dietary or []}
-
-        results: List[Dict[str, Any]] = []
-        for place in self._catalogue:
-            if cuisines and not any(c in place.cuisines for c in cuisines):
-                continue
-            if distance_km is not None and place.distance_km > distance_km:
-                continue
+        wanted_cuisines = [c.lower() for c in cuisines or []]
+        wanted_dietary = {d.lower() for d in dietary or []}
+
+        def accept(place: Place) -> bool:
+            if wanted_cuisines and not any(c in place.cuisines for c in wanted_cuisines):
+                return False
             if max_price is not None and place.price_level > max_price:
-                continue
-            if dietary and not dietary.issubset({tag.lower() for tag in place.tags}):
-                continue
-            results.append(
-                {
-                    "place_id": place.place_id,
-                    "name": place.name,
-                    "cuisines": place.cuisines,
-                    "tags": place.tags,
-                    "price_level": place.price_level,
-                    "distance_km": place.distance_km,
-                }
-            )
-        return results
+                return False
+            if wanted_dietary and not wanted_dietary.issubset({tag.lower() for tag in place.tags}):
+                return False
+            return True
+
+        # Rows are distance-ordered, so everything past the radius can be skipped.
+        stop = None if distance_km is None else (lambda place: place.distance_km > distance_km)
+        return paginate(self._ordered, self._keys, seek(self._keys, cursor), page_size, accept, _render, stop)
+
+
+def _render(place: Place) -> Dict[str, Any]:
+    return {
+        "place_id": place.place_id,
+        "name": place.name,
+        "cuisines": place.cuisines,
+        "tags": place.tags,
+        "price_level": place.price_level,
+        "distance_km": place.distance_km,
+    }
@@ -0,0 +1,330 @@
+"""Declarative registry for TableTalk tools.
+
+Each tool declares its argument schema once as a ``ToolSpec``. Registering the
+spec compiles it into a flat validator (one closure per argument plus a
+``frozenset`` of allowed keys) so dispatching a model-issued tool call is a
+dict lookup followed by a straight-line check—no ``inspect`` calls or
+``if/elif`` chains per request. Malformed calls raise ``ToolValidationError``
+before any backend is touched. Tools that can return results a page at a time
+also declare a ``pager``; ``dispatch_page`` runs it through the same
+validation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+from .booking import BookingTools, parse_iso
+from .menus import MenuLookupTool
+from .places import PlacesSearchTool
+
+
+class ToolValidationError(ValueError):
+    """Raised when a tool call is unknown or its arguments do not match the schema."""
+
+
+TypeSpec = Union[Type[Any], Tuple[Type[Any], ...]]
+Check = Callable[[Any], None]
+
+
+@dataclass(frozen=True)
+class ArgSpec:
+    """Schema for a single tool argument.
+
+    Parameters
+    ----------
+    name:
+        Keyword the handler expects.
+    type:
+        Accepted Python type(s). ``float`` also accepts ``int``; ``bool`` is
+        never accepted where a number is expected.
+    required:
+        Whether the model must supply the argument.
+    nullable:
+        Whether ``None`` is an acceptable value.
+    item_type:
+        For ``list`` arguments, the type every element must have.
+    check:
+        Optional extra validator that raises ``ValueError`` on bad input (e.g.
+        ISO timestamp parsing).
+    """
+
+    name: str
+    type: TypeSpec
+    required: bool = True
+    nullable: bool = False
+    item_type: Optional[TypeSpec] = None
+    check: Optional[Check] = None
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Declarative description of a tool exposed to the planner.
+
+    ``pager`` is an optional page-at-a-time variant of ``handler``. It takes
+    the same arguments plus ``page_size`` and ``cursor`` keywords and returns
+    ``{"items": [...], "next_cursor": str | None}``.
+    """
+
+    name: str
+    handler: Callable[..., Any]
+    args: Sequence[ArgSpec] = ()
+    description: str = ""
+    pager: Optional[Callable[..., Dict[str, Any]]] = None
+
+
+@dataclass
+class ToolResult:
+    """Typed tool output with a lazily cached JSON encoding."""
+
+    name: str
+    data: Any
+    next_cursor: Optional[str] = None
+    _encoded: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def to_event(self) -> Dict[str, Any]:
+        event = {"type": "tool_result", "name": self.name, "data": self.data}
+        if self.next_cursor is not None:
+            event["next_cursor"] = self.next_cursor
+        return event
+
+    def encode(self) -> str:
+        """Return the ``tool_result`` stream event, encoding it at most once."""
+
+        if self._encoded is None:
+            self._encoded = json.dumps(self.to_event())
+        return self._encoded
+
+
+def _normalise_type(spec: TypeSpec) -> Tuple[Type[Any], ...]:
+    types = spec if isinstance(spec, tuple) else (spec,)
+    if float in types and int not in types:
+        types = types + (int,)
+    return types
+
+
+def _compile_arg(tool: str, arg: ArgSpec) -> Callable[[Dict[str, Any]], None]:
+    name = arg.name
+    accepted = _normalise_type(arg.type)
+    reject_bool = bool not in accepted
+    item_types = _normalise_type(arg.item_type) if arg.item_type is not None else None
+    item_reject_bool = item_types is not None and bool not in item_types
+    required = arg.required
+    nullable = arg.nullable
+    check = arg.check
+    type_label = "/".join(t.__name__ for t in accepted)
+
+    def validate(arguments: Dict[str, Any]) -> None:
+        if name not in arguments:
+            if required:
+                raise ToolValidationError(f"{tool}: missing required argument '{name}'")
+            return
+        value = arguments[name]
+        if value is None:
+            if nullable:
+                return
+            raise ToolValidationError(f"{tool}: argument '{name}' must not be null")
+        if not isinstance(value, accepted) or (reject_bool and isinstance(value, bool)):
+            raise ToolValidationError(
+                f"{tool}: argument '{name}' expected {type_label}, got {type(value).__name__}"
+            )
+        if item_types is not None:
+            for item in value:
+                if not isinstance(item, item_types) or (item_reject_bool and isinstance(item, bool)):
+                    raise ToolValidationError(
+                        f"{tool}: argument '{name}' contains invalid item {item!r}"
+                    )
+        if check is not None:
+            try:
+                check(value)
+            except (TypeError, ValueError) as exc:
+                raise ToolValidationError(f"{tool}: argument '{name}' is invalid: {exc}") from exc
+
+    return validate
+
+
+class CompiledTool:
+    """A ``ToolSpec`` with its validators resolved ahead of time."""
+
+    __slots__ = ("name", "handler", "pager", "description", "_allowed", "_validators")
+
+    def __init__(self, spec: ToolSpec) -> None:
+        self.name = spec.name
+        self.handler = spec.handler
+        self.pager = spec.pager
+        self.description = spec.description
+        self._allowed = frozenset(arg.name for arg in spec.args)
+        self._validators = tuple(_compile_arg(spec.name, arg) for arg in spec.args)
+
+    def validate(self, arguments: Any) -> Dict[str, Any]:
+        if not isinstance(arguments, dict):
+            raise ToolValidationError(f"{self.name}: arguments must be an object")
+        if not self._allowed.issuperset(arguments):
+            unknown = sorted(set(arguments) - self._allowed)
+            raise ToolValidationError(f"{self.name}: unexpected argument(s) {', '.join(unknown)}")
+        for validator in self._validators:
+            validator(arguments)
+        return arguments
+
+    def __call__(self, arguments: Any) -> ToolResult:
+        return ToolResult(name=self.name, data=self.handler(**self.validate(arguments)))
+
+    def page(self, arguments: Any, page_size: int, cursor: Optional[str] = None) -> ToolResult:
+        """Run the pager; ``next_cursor`` on the result is the tool's own cursor."""
+
+        if self.pager is None:
+            raise ToolValidationError(f"{self.name}: tool does not support pagination")
+        page = self.pager(**self.validate(arguments), page_size=page_size, cursor=cursor)
+        return ToolResult(name=self.name, data=page["items"], next_cursor=page["next_cursor"])
+
+
+class ToolRegistry:
+    """Name → compiled tool mapping used by the agent runner."""
+
+    def __init__(self, specs: Sequence[ToolSpec] = ()) -> None:
+        self._tools: Dict[str, CompiledTool] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: ToolSpec) -> CompiledTool:
+        if spec.name in self._tools:
+            raise ValueError(f"tool '{spec.name}' is already registered")
+        compiled = CompiledTool(spec)
+        self._tools[spec.name] = compiled
+        return compiled
+
+    def get(self, name: str) -> CompiledTool:
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise ToolValidationError(f"unknown tool {name}") from None
+
+    def validate(self, name: str, arguments: Any) -> Dict[str, Any]:
+        return self.get(name).validate(arguments)
+
+    def dispatch(self, name: str, arguments: Any) -> ToolResult:
+        return self.get(name)(arguments)
+
+    def dispatch_page(self, name: str, arguments: Any, page_size: int, cursor: Optional[str] = None) -> ToolResult:
+        return self.get(name).page(arguments, page_size, cursor)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+
+def build_default_registry(
+    places: Optional[PlacesSearchTool] = None,
+    menus: Optional[MenuLookupTool] = None,
+    booking: Optional[BookingTools] = None,
+) -> ToolRegistry:
+    """Register the built-in TableTalk tools against the given backends."""
+
+    places = places or PlacesSearchTool()
+    menus = menus or MenuLookupTool()
+    booking = booking or BookingTools()
+
+    return ToolRegistry(
+        [
+            ToolSpec(
+                name="places.search",
+                handler=places.search,
+                pager=places.search_page,
+                description="Search candidate restaurants near a location",
+                args=(
+                    ArgSpec("near", str, nullable=True),
+                    ArgSpec("cuisines", list, required=False, nullable=True, item_type=str),
+                    ArgSpec("dietary", list, required=False, nullable=True, item_type=str),
+                    ArgSpec("max_price", float, required=False, nullable=True),
+                    ArgSpec("distance_km", float, required=False, nullable=True),
+                ),
+            ),
+            ToolSpec(
+                name="menus.lookup",
+                handler=menus.lookup,
+                pager=menus.lookup_page,
+                description="Fetch menu items for a place",
+                args=(ArgSpec("place_id", str),),
+            ),
+            ToolSpec(
+                name="book.deeplink",
+                handler=booking.make_deeplink,
+                description="Build a booking deeplink",
+                args=(
+                    ArgSpec("place_id", str),
+                    ArgSpec("party_size", int),
+                    ArgSpec("datetime_iso", str, check=parse_iso),
+                ),
+            ),
+            ToolSpec(
+                name="book.calendar_event",
+                handler=booking.create_calendar_event,
+                description="Create a tentative calendar entry",
+                args=(
+                    ArgSpec("title", str),
+                    ArgSpec("start_iso", str, check=parse_iso),
+                    ArgSpec("end_iso", str, check=parse_iso),
+                    ArgSpec("location", str),
+                ),
+            ),
+        ]
+    )
+
+
+def _bench(iterations: int) -> Dict[str, float]:
+    """Measure per-call dispatch + validation overhead against direct calls."""
+
+    places = PlacesSearchTool()
+    menus = MenuLookupTool()
+    booking = BookingTools()
+    registry = build_default_registry(places, menus, booking)
+    calls: List[Tuple[str, Mapping[str, Any]]] = [
+        ("places.search", {"near": "94105", "dietary": ["vegan"], "max_price": 2, "distance_km": 5}),
+        ("menus.lookup", {"place_id": "demo-ramen"}),
+        ("book.deeplink", {"place_id": "demo-ramen", "party_size": 2, "datetime_iso": "2024-05-01T19:00:00Z"}),
+    ]
+    direct = {
+        "places.search": places.search,
+        "menus.lookup": menus.lookup,
+        "book.deeplink": booking.make_deeplink,
+    }
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for name, args in calls:
+            direct[name](**args)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for name, args in calls:
+            registry.dispatch(name, dict(args))
+    dispatched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for name, args in calls:
+            registry.validate(name, dict(args))
+    validate_only = time.perf_counter() - start
+
+    total_calls = iterations * len(calls)
+    return {
+        "calls": total_calls,
+        "direct_us_per_call": baseline / total_calls * 1e6,
+        "registry_us_per_call": dispatched / total_calls * 1e6,
+        "validate_us_per_call": validate_only / total_calls * 1e6,
+        "overhead_us_per_call": (dispatched - baseline) / total_calls * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tool registry dispatch overhead.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(_bench(args.iterations), indent=2))
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import os
+from pathlib import Path
+
 from fastapi import FastAPI
 
+from .middlewares.recorder import ChatRecorder, ChatRecordingMiddleware
 from .routes import chat
 
 app = FastAPI(title="TableTalk API", version="0.1.0")
 app.include_router(chat.router)
 
+# Set TABLETALK_RECORD_PATH to capture anonymised /chat traffic for replay with
+# ``python -m eval.load.replay``.
+_record_path = os.environ.get("TABLETALK_RECORD_PATH")
+if _record_path:
+    _recorder = ChatRecorder(Path(_record_path), salt=os.environ.get("TABLETALK_RECORD_SALT", ""))
+    app.add_middleware(ChatRecordingMiddleware, recorder=_recorder)
+    app.add_event_handler("shutdown", _recorder.close)
+
 
 @app.get("/healthz", tags=["health"])
 async def healthcheck() -> dict[str, str]:
@@ -0,0 +1,174 @@
+"""ASGI middleware that records anonymised ``/chat`` traffic for load replay.
+
+Each ``POST /chat`` body is appended to a JSONL file as one line. Session ids
+are replaced with a salted hash, emails and phone numbers in the message are
+masked, ZIP-code locations are cut to their first three digits (other
+locations are hashed), and client ``meta`` is dropped. The line also stores
+the arrival offset in seconds from when the recorder started.
+``eval/load/replay.py`` reads this file to reproduce the session and arrival
+pattern.
+
+The request path only timestamps the body and puts it on a queue; a
+background thread anonymises and writes entries, so recording does not add
+file I/O to the latency it is meant to measure.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, MutableMapping, Optional, Tuple
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+_ZIP = re.compile(r"\s*(\d{3})\d{2}(?:-\d{4})?\s*")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Phone shapes only: +<country> followed by 9+ digits/separators, or a
+# 3-3-4 number such as (415) 555-1234. Anything glued to other digits or
+# dashes is left alone, so ISO dates, times and ZIP codes survive.
+_PHONE = re.compile(
+    r"(?<![\w+-])(?:"
+    r"\+\d[\d\s.-]{8,}\d"
+    r"|(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}"
+    r")(?![\w-])"
+)
+
+
+def anonymise_message(text: str) -> str:
+    """Mask emails and phone numbers so recordings can be shared."""
+
+    return _PHONE.sub("<phone>", _EMAIL.sub("<email>", text))
+
+
+class ChatRecorder:
+    """Append anonymised chat requests to a JSONL recording from a writer thread."""
+
+    def __init__(self, path: Path, salt: str = "", clock: Callable[[], float] = time.monotonic) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._salt = salt
+        self._clock = clock
+        self._start = clock()
+        self._queue: "queue.Queue[Optional[Tuple[float, Dict[str, Any]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def _token(self, value: str) -> str:
+        return hashlib.sha256((self._salt + value).encode("utf-8")).hexdigest()[:16]
+
+    def _coarse_location(self, location: Any) -> Optional[str]:
+        if not isinstance(location, str) or not location:
+            return None
+        match = _ZIP.fullmatch(location)
+        return f"{match.group(1)}xx" if match else self._token(location)
+
+    def anonymise(self, payload: Dict[str, Any], arrived: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        session_id = payload.get("session_id")
+        message = payload.get("message")
+        if not isinstance(session_id, str) or not isinstance(message, str):
+            return None
+        arrived = self._clock() if arrived is None else arrived
+        return {
+            "session": self._token(session_id),
+            "t": round(arrived - self._start, 6),
+            "message": anonymise_message(message),
+            "location": self._coarse_location(payload.get("location")),
+        }
+
+    def record(self, payload: Dict[str, Any]) -> None:
+        """Queue a request body for recording; never blocks on the file."""
+
+        self._ensure_writer()
+        self._queue.put((self._clock(), payload))
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written."""
+
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write out queued entries and stop the writer thread."""
+
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain, name="chat-recorder", daemon=True)
+                self._writer.start()
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Write whatever else is already waiting in the same append.
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            lines = []
+            for queued in batch:
+                if queued is not None:
+                    entry = self.anonymise(queued[1], arrived=queued[0])
+                    if entry is not None:
+                        lines.append(json.dumps(entry) + "\n")
+            try:
+                if lines:
+                    with self._path.open("a", encoding="utf-8") as sink:
+                        sink.writelines(lines)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+
+class ChatRecordingMiddleware:
+    """Pure ASGI middleware that tees ``POST /chat`` bodies into a recorder."""
+
+    def __init__(self, app: ASGIApp, recorder: ChatRecorder, path: str = "/chat") -> None:
+        self.app = app
+        self.recorder = recorder
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") != "POST" or scope.get("path") != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        chunks: list[bytes] = []
+
+        async def tee() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    self._record(b"".join(chunks))
+            return message
+
+        await self.app(scope, tee, send)
+
+    def _record(self, body: bytes) -> None:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+        if isinstance(payload, dict):
+            self.recorder.record(payload)
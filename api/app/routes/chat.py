@@ -3,18 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+from functools import lru_cache
 from typing import AsyncGenerator
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 
-from ..schemas.chat import ChatRequest
+from ..schemas.chat import ChatRequest, PageRequest
 from ..services.agent_runner import AgentRunner
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+@lru_cache(maxsize=1)
 def get_agent_runner() -> AgentRunner:
+    # Shared across requests so session state and speculative prefetches
+    # survive between turns.
     return AgentRunner()
 
 
@@ -28,3 +32,14 @@ async def chat_endpoint(payload: ChatRequest, runner: AgentRunner = Depends(get_
             await asyncio.sleep(0)
 
     return StreamingResponse(event_stream(), media_type="application/jsonl")
+
+
+@router.post("/page", response_class=StreamingResponse)
+async def page_endpoint(payload: PageRequest, runner: AgentRunner = Depends(get_agent_runner)) -> StreamingResponse:
+    """Stream the next page of a paginated tool result."""
+
+    async def event_stream() -> AsyncGenerator[bytes, None]:
+        async for chunk in runner.stream_page(payload.cursor):
+            yield (chunk + "\n").encode("utf-8")
+
+    return StreamingResponse(event_stream(), media_type="application/jsonl")
@@ -12,3 +12,7 @@ class ChatRequest(BaseModel):
     message: str = Field(..., description="Latest user utterance")
     location: Optional[str] = Field(None, description="User-provided coarse location")
     meta: Dict[str, Any] = Field(default_factory=dict, description="Client metadata")
+
+
+class PageRequest(BaseModel):
+    cursor: str = Field(..., description="Self-contained next_cursor from a previous tool_result event")
@@ -2,44 +2,215 @@
 
 from __future__ import annotations
 
+import base64
 import json
-from typing import AsyncGenerator
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
 
-from agent.adk_app.planner import ConversationState, TableTalkPlanner
-from agent.tools import BookingTools, MenuLookupTool, PlacesSearchTool
+from agent.adk_app.persistence import SessionStore, SnapshotFormatError
+from agent.adk_app.planner import ConversationState, Observation, TableTalkPlanner, ToolCall
+from agent.tools import (
+    BookingTools,
+    MenuLookupTool,
+    PlacesSearchTool,
+    ToolResult,
+    ToolValidationError,
+    build_default_registry,
+)
 from ..schemas.chat import ChatRequest
+from .speculation import SpeculativePrefetcher
 
 
 class AgentRunner:
-    """Executes the planner loop and yields streaming chunks."""
+    """Executes the planner loop and yields streaming chunks.
 
-    def __init__(self) -> None:
+    Results of paginated tools are streamed one page at a time: the first page
+    goes out with the turn, carrying a ``next_cursor``, and a later page is
+    only computed when the client calls ``stream_page`` with that cursor. The
+    cursor carries the tool name, its arguments and the tool's keyset cursor,
+    so any worker can serve the next page without shared state.
+
+    Sessions idle for ``session_ttl_s``, or beyond the ``max_sessions`` most
+    recently used, are dropped from memory (persisted state is kept), so a
+    long-lived shared runner does not grow with every session id.
+    """
+
+    def __init__(
+        self,
+        places: Optional[PlacesSearchTool] = None,
+        menus: Optional[MenuLookupTool] = None,
+        booking: Optional[BookingTools] = None,
+        speculate: bool = True,
+        speculation_budget: int = 4,
+        session_store: Optional[SessionStore] = None,
+        page_size: Optional[int] = 20,
+        max_sessions: int = 1024,
+        session_ttl_s: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self._planner = TableTalkPlanner()
-        self._places = PlacesSearchTool()
-        self._menus = MenuLookupTool()
-        self._booking = BookingTools()
+        self._places = places or PlacesSearchTool()
+        self._menus = menus or MenuLookupTool()
+        self._booking = booking or BookingTools()
+        self._tools = build_default_registry(self._places, self._menus, self._booking)
         self._sessions: dict[str, ConversationState] = {}
+        self._speculate = speculate
+        self._speculation_budget = speculation_budget
+        self._prefetchers: dict[str, SpeculativePrefetcher] = {}
+        self._store = session_store
+        self._page_size = page_size
+        self._max_sessions = max_sessions
+        self._session_ttl_s = session_ttl_s
+        self._clock = clock
+        self._last_seen: OrderedDict[str, float] = OrderedDict()
 
     async def stream_chat(self, payload: ChatRequest) -> AsyncGenerator[str, None]:
-        state = self._sessions.setdefault(
-            payload.session_id,
-            ConversationState(preferences={}, history=[]),
-        )
-        result = self._planner.plan(state, payload.message)
-
-        yield json.dumps({"type": "plan", "data": result})
-
-        for tool in result["tool_queue"]:
-            name = tool["name"]
-            args = tool["arguments"]
-            if name == "places.search":
-                data = self._places.search(**args)
-            elif name == "menus.lookup":
-                data = self._menus.lookup(**args)
-            elif name == "book.deeplink":
-                data = self._booking.make_deeplink(**args)
-            else:
-                data = {"error": f"unknown tool {name}"}
-            yield json.dumps({"type": "tool_result", "name": name, "data": data})
+        self._touch(payload.session_id)
+        state = self._load_session(payload.session_id)
+        if payload.location:
+            state.preferences.setdefault("location", payload.location)
+        prefetcher = self._prefetcher(payload.session_id)
+        if prefetcher is not None:
+            prefetcher.advance()
+
+        result = self._planner.plan(Observation(role="user", content=payload.message), state)
+
+        try:
+            yield json.dumps({"type": "plan", "data": result.to_wire_format()})
+
+            for call in result.tool_calls:
+                try:
+                    tool_result = await self._execute(call, prefetcher)
+                except ToolValidationError as exc:
+                    yield json.dumps({"type": "tool_result", "name": call.name, "data": {"error": str(exc)}})
+                    continue
+                state.ingest_observation(Observation(role="tool", content=tool_result.data, tool_name=call.name))
+                if prefetcher is not None:
+                    # Kick off likely follow-up calls before the client has even
+                    # read this result so the next turn can be served from cache.
+                    prefetcher.schedule(call.name, tool_result.data, state.preferences)
+                yield tool_result.encode()
+        finally:
+            # Runs even if the client disconnects mid-stream, so unused
+            # speculation from the previous turn never lingers and the turn
+            # is still persisted for other workers.
+            if prefetcher is not None:
+                prefetcher.retire()
+            if self._store is not None:
+                self._store.save(payload.session_id, state)
 
         yield json.dumps({"type": "final", "data": "TODO: integrate Bedrock completion"})
+
+    async def stream_page(self, cursor: str) -> AsyncGenerator[str, None]:
+        """Yield the next page of a paginated tool result as a ``tool_result`` event."""
+
+        try:
+            name, arguments, tool_cursor = _decode_page_cursor(cursor)
+            result = self._fetch_page(name, arguments, tool_cursor)
+        except ValueError as exc:  # includes ToolValidationError
+            yield json.dumps({"type": "error", "data": f"invalid cursor: {exc}"})
+            return
+        yield result.encode()
+
+    def speculation_stats(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return speculation counters for a session, if speculation is enabled."""
+
+        prefetcher = self._prefetchers.get(session_id)
+        return prefetcher.stats.to_dict() if prefetcher is not None else None
+
+    def close_session(self, session_id: str) -> None:
+        """Drop session state, including persisted state, and retire any outstanding speculation."""
+
+        self._forget(session_id)
+        if self._store is not None:
+            self._store.delete(session_id)
+
+    def _forget(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self._last_seen.pop(session_id, None)
+        prefetcher = self._prefetchers.pop(session_id, None)
+        if prefetcher is not None:
+            prefetcher.close()
+
+    def _touch(self, session_id: str) -> None:
+        """Mark the session as used and evict idle or least recently used ones."""
+
+        now = self._clock()
+        self._last_seen[session_id] = now
+        self._last_seen.move_to_end(session_id)
+        while self._last_seen:
+            oldest, seen = next(iter(self._last_seen.items()))
+            if oldest == session_id:
+                break
+            if len(self._last_seen) <= self._max_sessions and now - seen <= self._session_ttl_s:
+                break
+            self._forget(oldest)
+
+    def _load_session(self, session_id: str) -> ConversationState:
+        state = self._sessions.get(session_id)
+        if self._store is not None and (state is None or not self._store.is_current(session_id)):
+            # Another worker may have served earlier turns of this session,
+            # in which case our in-memory copy is stale.
+            try:
+                state = self._store.load(session_id)
+            except SnapshotFormatError:
+                # Unreadable log: start over; the next save rewrites it.
+                state = None
+        if state is None:
+            state = ConversationState(preferences={}, history=[])
+        self._sessions[session_id] = state
+        return state
+
+    def _prefetcher(self, session_id: str) -> Optional[SpeculativePrefetcher]:
+        if not self._speculate:
+            return None
+        prefetcher = self._prefetchers.get(session_id)
+        if prefetcher is None:
+            prefetcher = SpeculativePrefetcher(
+                self._tools, budget=self._speculation_budget, page_size=self._page_size
+            )
+            self._prefetchers[session_id] = prefetcher
+        return prefetcher
+
+    async def _execute(self, call: ToolCall, prefetcher: Optional[SpeculativePrefetcher]) -> ToolResult:
+        if prefetcher is not None:
+            speculated = await prefetcher.take(call.name, call.arguments)
+            if speculated is not None:
+                # The prefetcher pages with our page size, so a hit has the
+                # same shape as a fresh call.
+                return self._with_page_cursor(speculated, call.arguments)
+        if not self._page_size or self._tools.get(call.name).pager is None:
+            return self._tools.dispatch(call.name, call.arguments)
+        return self._fetch_page(call.name, call.arguments, None)
+
+    def _fetch_page(self, name: str, arguments: Dict[str, Any], cursor: Optional[str]) -> ToolResult:
+        if not self._page_size:
+            raise ValueError("pagination is disabled")
+        return self._with_page_cursor(self._tools.dispatch_page(name, arguments, self._page_size, cursor), arguments)
+
+    @staticmethod
+    def _with_page_cursor(result: ToolResult, arguments: Dict[str, Any]) -> ToolResult:
+        """Replace the tool's own cursor with one that also names the call."""
+
+        if result.next_cursor is None:
+            return result
+        next_cursor = _encode_page_cursor(result.name, arguments, result.next_cursor)
+        return ToolResult(name=result.name, data=result.data, next_cursor=next_cursor)
+
+
+def _encode_page_cursor(name: str, arguments: Dict[str, Any], cursor: str) -> str:
+    raw = json.dumps({"t": name, "a": arguments, "c": cursor}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_page_cursor(token: str) -> tuple[str, Dict[str, Any], str]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        name, arguments, cursor = decoded["t"], decoded["a"], decoded["c"]
+    except (ValueError, UnicodeError, TypeError, KeyError) as exc:
+        raise ValueError("malformed cursor") from exc
+    if not isinstance(name, str) or not isinstance(arguments, dict) or not isinstance(cursor, str):
+        raise ValueError("malformed cursor")
+    return name, arguments, cursor
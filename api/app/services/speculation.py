@@ -0,0 +1,204 @@
+"""Speculative prefetch of the tool calls that usually follow a search.
+
+After ``places.search`` the planner's next turn almost always asks for
+``menus.lookup`` on the shortlisted places, and booking deeplinks are often
+requested next. ``SpeculativePrefetcher`` starts those calls in the background
+while the current turn is still streaming, keeps the results keyed by
+``(tool, arguments)`` and hands them to the follow-up turn. Anything the
+follow-up turn does not consume is retired and counted as wasted work.
+
+Tools run in worker threads, and a thread that has already entered a backend
+call cannot be interrupted: retiring a call only stops it if it has not
+started yet. A call that was already running completes and its result is
+discarded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent.adk_app.planner import TableTalkPlanner, ToolCall
+from agent.tools import ToolRegistry, ToolResult, ToolValidationError
+
+CacheKey = Tuple[str, str]
+
+
+def _cache_key(name: str, arguments: Dict[str, Any]) -> CacheKey:
+    return name, json.dumps(arguments, sort_keys=True, default=str)
+
+
+@dataclass
+class SpeculationStats:
+    """Counters used to judge whether speculation pays for itself."""
+
+    issued: int = 0
+    hits: int = 0
+    wasted: int = 0
+
+    @property
+    def wasted_ratio(self) -> float:
+        return self.wasted / self.issued if self.issued else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "issued": self.issued,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "wasted_ratio": self.wasted_ratio,
+        }
+
+
+@dataclass
+class _Pending:
+    task: "asyncio.Future[ToolResult]"
+    generation: int
+    retired: threading.Event
+
+    def retire(self) -> None:
+        self.retired.set()
+        self.task.cancel()
+
+
+def _run_unless_retired(
+    tool: Callable[[Dict[str, Any]], ToolResult], arguments: Dict[str, Any], retired: threading.Event
+) -> Optional[ToolResult]:
+    # Checked in the worker thread: a call retired while still queued never
+    # reaches the backend.
+    if retired.is_set():
+        return None
+    return tool(arguments)
+
+
+class SpeculativePrefetcher:
+    """Per-session cache of speculatively executed tool calls.
+
+    Parameters
+    ----------
+    registry:
+        Registry used to validate and run speculative calls.
+    top_k:
+        How many of the top search results get a speculative menu lookup.
+    budget:
+        Maximum number of speculative calls issued per turn, counted across
+        all ``schedule`` calls between two ``advance`` calls. Menu lookups are
+        scheduled before booking deeplinks.
+    page_size:
+        If set, tools that support pagination are speculated as their first
+        page of this size, matching what the runner would have sent.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        top_k: int = TableTalkPlanner.MENU_FANOUT,
+        budget: int = 4,
+        page_size: Optional[int] = None,
+    ) -> None:
+        self._registry = registry
+        self._top_k = top_k
+        self._budget = budget
+        self._page_size = page_size
+        self._pending: Dict[CacheKey, _Pending] = {}
+        self._generation = 0
+        self._issued_this_turn = 0
+        self.stats = SpeculationStats()
+
+    def predict(self, name: str, data: Any, preferences: Dict[str, Any]) -> List[ToolCall]:
+        """Return the tool calls likely to follow ``name`` returning ``data``, most likely first."""
+
+        if name != "places.search" or not isinstance(data, list):
+            return []
+        place_ids = [item["place_id"] for item in data[: self._top_k] if isinstance(item, dict) and "place_id" in item]
+        calls = [ToolCall(name="menus.lookup", arguments={"place_id": place_id}) for place_id in place_ids]
+
+        party_size = preferences.get("party_size")
+        datetime_iso = preferences.get("datetime_iso")
+        if party_size is not None and datetime_iso is not None:
+            calls.extend(
+                ToolCall(
+                    name="book.deeplink",
+                    arguments={"place_id": place_id, "party_size": party_size, "datetime_iso": datetime_iso},
+                )
+                for place_id in place_ids
+            )
+        return calls
+
+    def schedule(self, name: str, data: Any, preferences: Dict[str, Any]) -> int:
+        """Start background execution of predicted follow-up calls.
+
+        Returns the number of calls issued. Calls that fail validation or are
+        already in flight are skipped and do not count against the budget.
+        """
+
+        issued = 0
+        for call in self.predict(name, data, preferences):
+            if self._issued_this_turn + issued >= self._budget:
+                break
+            key = _cache_key(call.name, call.arguments)
+            if key in self._pending:
+                continue
+            try:
+                tool = self._registry.get(call.name)
+                arguments = tool.validate(dict(call.arguments))
+            except ToolValidationError:
+                continue
+            run: Callable[[Dict[str, Any]], ToolResult] = tool
+            if self._page_size and tool.pager is not None:
+                run = functools.partial(tool.page, page_size=self._page_size)
+            retired = threading.Event()
+            task = asyncio.ensure_future(asyncio.to_thread(_run_unless_retired, run, arguments, retired))
+            self._pending[key] = _Pending(task=task, generation=self._generation, retired=retired)
+            issued += 1
+        self._issued_this_turn += issued
+        self.stats.issued += issued
+        return issued
+
+    async def take(self, name: str, arguments: Dict[str, Any]) -> Optional[ToolResult]:
+        """Return a speculated result for the call, waiting if it is still running.
+
+        Returns ``None`` on a miss or if the speculative call failed, in which
+        case the caller should execute the tool itself.
+        """
+
+        pending = self._pending.pop(_cache_key(name, arguments), None)
+        if pending is None:
+            return None
+        try:
+            result = await pending.task
+        except Exception:
+            self.stats.wasted += 1
+            return None
+        self.stats.hits += 1
+        return result
+
+    def advance(self) -> None:
+        """Mark the start of a new turn; earlier speculation becomes retirable."""
+
+        self._generation += 1
+        self._issued_this_turn = 0
+
+    def retire(self) -> int:
+        """Retire speculation issued before the current turn that went unused.
+
+        Calls that have not reached the backend yet are skipped; calls already
+        running in their thread finish and their result is dropped.
+        """
+
+        stale = [key for key, pending in self._pending.items() if pending.generation < self._generation]
+        for key in stale:
+            self._pending.pop(key).retire()
+        self.stats.wasted += len(stale)
+        return len(stale)
+
+    def close(self) -> None:
+        """Retire all outstanding speculation (see ``retire`` for what that stops)."""
+
+        for pending in self._pending.values():
+            pending.retire()
+        self.stats.wasted += len(self._pending)
+        self._pending.clear()
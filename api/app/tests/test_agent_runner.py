@@ -0,0 +1,279 @@
+"""Tests for the streaming agent runner."""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("pydantic")  # type: ignore
+
+from agent.adk_app import ConversationState, SessionStore
+from agent.tools import MenuLookupTool, PlacesSearchTool
+from api.app.schemas.chat import ChatRequest
+from api.app.services.agent_runner import AgentRunner
+
+PREFERENCES = {"diet": ["vegan"], "budget": 2, "distance_km": 5, "location": "94105"}
+
+
+def _collect(runner: AgentRunner, *payloads: ChatRequest) -> list:
+    """Run each turn on one event loop and return the last turn's events."""
+
+    async def run() -> list:
+        events: list = []
+        for payload in payloads:
+            events = [json.loads(chunk) async for chunk in runner.stream_chat(payload)]
+        return events
+
+    return asyncio.run(run())
+
+
+def test_stream_chat_dispatches_planned_tools() -> None:
+    runner = AgentRunner()
+    runner._sessions["s1"] = ConversationState(preferences=dict(PREFERENCES))
+
+    events = _collect(runner, ChatRequest(session_id="s1", message="ramen please"))
+
+    assert [event["type"] for event in events] == ["plan", "tool_result", "final"]
+    assert events[1]["name"] == "places.search"
+    assert events[1]["data"][0]["place_id"] == "demo-ramen"
+
+
+def test_follow_up_turn_is_served_from_speculation() -> None:
+    runner = AgentRunner()
+    runner._sessions["s2"] = ConversationState(preferences=dict(PREFERENCES))
+
+    events = _collect(
+        runner,
+        ChatRequest(session_id="s2", message="ramen please"),
+        ChatRequest(session_id="s2", message="what's on the menu?"),
+    )
+
+    tool_events = [event for event in events if event["type"] == "tool_result"]
+    assert [event["name"] for event in tool_events] == ["menus.lookup"]
+    assert tool_events[0]["data"][0]["item_id"] == "miso-vegan"
+    assert runner.speculation_stats("s2") == {"issued": 1, "hits": 1, "wasted": 0, "wasted_ratio": 0.0}
+
+
+def test_unused_speculation_is_cancelled_and_counted_as_waste() -> None:
+    runner = AgentRunner()
+    runner._sessions["s3"] = ConversationState(
+        preferences=dict(PREFERENCES, party_size=2, datetime_iso="2024-05-01T19:00:00Z")
+    )
+
+    _collect(
+        runner,
+        ChatRequest(session_id="s3", message="ramen please"),
+        ChatRequest(session_id="s3", message="what's on the menu?"),
+    )
+
+    stats = runner.speculation_stats("s3")
+    assert stats is not None
+    assert stats["issued"] == 2 and stats["hits"] == 1 and stats["wasted"] == 1
+
+
+def test_session_state_is_rehydrated_by_another_worker(tmp_path) -> None:
+    first = AgentRunner(session_store=SessionStore(tmp_path))
+    first._sessions["s4"] = ConversationState(preferences=dict(PREFERENCES))
+    _collect(first, ChatRequest(session_id="s4", message="ramen please"))
+
+    second = AgentRunner(session_store=SessionStore(tmp_path))
+    events = _collect(second, ChatRequest(session_id="s4", message="what's on the menu?"))
+
+    assert [event["name"] for event in events if event["type"] == "tool_result"] == ["menus.lookup"]
+
+
+def test_session_alternating_between_workers_stays_loadable(tmp_path) -> None:
+    worker_a = AgentRunner(session_store=SessionStore(tmp_path))
+    worker_b = AgentRunner(session_store=SessionStore(tmp_path))
+    worker_a._sessions["s7"] = ConversationState(preferences=dict(PREFERENCES))
+
+    _collect(worker_a, ChatRequest(session_id="s7", message="ramen please"))
+    _collect(worker_b, ChatRequest(session_id="s7", message="what's on the menu?"))
+    _collect(worker_a, ChatRequest(session_id="s7", message="anything else?"))
+
+    restored = SessionStore(tmp_path).load("s7")
+    assert restored is not None
+    assert [obs.content for obs in restored.history if obs.role == "user"] == [
+        "ramen please",
+        "what's on the menu?",
+        "anything else?",
+    ]
+    assert restored.history == worker_a._sessions["s7"].history
+
+
+def test_unreadable_session_log_does_not_break_the_stream(tmp_path) -> None:
+    (tmp_path / "s8.ttcs").write_bytes(b"\x05garbage")
+    runner = AgentRunner(session_store=SessionStore(tmp_path))
+
+    events = _collect(runner, ChatRequest(session_id="s8", message="hi"))
+
+    assert events[-1]["type"] == "final"
+    assert SessionStore(tmp_path).load("s8") is not None
+
+
+def test_disconnected_turn_is_still_persisted(tmp_path) -> None:
+    worker_a = AgentRunner(session_store=SessionStore(tmp_path), speculate=False)
+    worker_a._sessions["s10"] = ConversationState(preferences=dict(PREFERENCES))
+
+    async def run() -> None:
+        stream = worker_a.stream_chat(ChatRequest(session_id="s10", message="ramen please"))
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(run())
+    restored = SessionStore(tmp_path).load("s10")
+    assert restored is not None and restored.last_user_message() == "ramen please"
+
+
+def _paged_catalogue(size: int) -> list:
+    return [
+        {
+            "place_id": f"p{index:03d}",
+            "name": f"Place {index}",
+            "cuisines": ["japanese"],
+            "tags": ["vegan"],
+            "price_level": 1 + index % 2,
+            "distance_km": 1.0 + index / 100,
+        }
+        for index in range(size)
+    ]
+
+
+async def _page(runner: AgentRunner, cursor: str) -> dict:
+    return [json.loads(chunk) async for chunk in runner.stream_page(cursor)][0]
+
+
+def test_large_results_stream_first_page_and_fetch_more_lazily() -> None:
+    runner = AgentRunner(places=PlacesSearchTool(_paged_catalogue(7)), page_size=3, speculate=False)
+    runner._sessions["s5"] = ConversationState(preferences=dict(PREFERENCES))
+
+    async def run() -> list:
+        events = [json.loads(chunk) async for chunk in runner.stream_chat(ChatRequest(session_id="s5", message="hi"))]
+        pages = [events[1]]
+        while "next_cursor" in pages[-1]:
+            pages.append(await _page(runner, pages[-1]["next_cursor"]))
+        return [pages, await _page(runner, pages[0]["next_cursor"]), await _page(runner, "not-a-cursor")]
+
+    pages, replayed, invalid = asyncio.run(run())
+
+    assert [len(page["data"]) for page in pages] == [3, 3, 2]
+    assert [item["place_id"] for page in pages for item in page["data"]][:2] == ["p000", "p001"]
+    assert replayed == pages[1]
+    assert invalid["type"] == "error"
+
+
+def test_page_cursor_is_served_by_another_worker() -> None:
+    catalogue = _paged_catalogue(7)
+    worker_a = AgentRunner(places=PlacesSearchTool(catalogue), page_size=3, speculate=False)
+    worker_b = AgentRunner(places=PlacesSearchTool(catalogue), page_size=3, speculate=False)
+    worker_a._sessions["s9"] = ConversationState(preferences=dict(PREFERENCES))
+
+    async def run() -> list:
+        events = [json.loads(chunk) async for chunk in worker_a.stream_chat(ChatRequest(session_id="s9", message="hi"))]
+        return [events[1], await _page(worker_b, events[1]["next_cursor"])]
+
+    first, second = asyncio.run(run())
+
+    assert second["type"] == "tool_result"
+    assert [item["place_id"] for item in second["data"]] == ["p003", "p004", "p005"]
+
+
+def test_page_cursors_do_not_collide_across_searches() -> None:
+    # Both first pages end on p000, so the keyset cursors alone are identical.
+    runner = AgentRunner(places=PlacesSearchTool(_paged_catalogue(6)), page_size=2, speculate=False)
+    cheap = runner._fetch_page("places.search", {"near": "94105", "max_price": 1}, None)
+    anything = runner._fetch_page("places.search", {"near": "94105"}, None)
+
+    async def run() -> list:
+        return [await _page(runner, cheap.next_cursor), await _page(runner, anything.next_cursor)]
+
+    cheap_next, anything_next = asyncio.run(run())
+
+    assert cheap.next_cursor != anything.next_cursor
+    assert [item["place_id"] for item in cheap_next["data"]] == ["p002", "p004"]
+    assert [item["place_id"] for item in anything_next["data"]] == ["p001", "p002"]
+
+
+def test_speculated_results_are_paged_like_fresh_ones() -> None:
+    items = [
+        {"place_id": "demo-ramen", "item_id": f"extra-{index:03d}", "name": "Side", "price": 3.0, "tags": [], "cuisine": []}
+        for index in range(100)
+    ]
+    turns = (
+        ChatRequest(session_id="s11", message="ramen please"),
+        ChatRequest(session_id="s11", message="what's on the menu?"),
+    )
+    runners = [AgentRunner(menus=MenuLookupTool(items), page_size=5, speculate=flag) for flag in (True, False)]
+    shapes = []
+    for runner in runners:
+        runner._sessions["s11"] = ConversationState(preferences=dict(PREFERENCES))
+        events = _collect(runner, *turns)
+        shapes.append([(event["name"], event["data"], event.get("next_cursor")) for event in events[1:-1]])
+
+    assert runners[0].speculation_stats("s11")["hits"] == 1  # type: ignore[index]
+    assert shapes[0] == shapes[1]
+    assert len(shapes[0][0][1]) == 5 and shapes[0][0][2] is not None
+
+
+def test_speculation_budget_is_shared_across_a_turn() -> None:
+    from agent.tools import build_default_registry
+    from api.app.services.speculation import SpeculativePrefetcher
+
+    async def run() -> tuple:
+        prefetcher = SpeculativePrefetcher(build_default_registry(), budget=2)
+        results = [{"place_id": "demo-ramen"}, {"place_id": "demo-pizza"}, {"place_id": "demo-other"}]
+        first = prefetcher.schedule("places.search", results[:1], {})
+        # demo-ramen is already in flight, so it is skipped without using budget.
+        second = prefetcher.schedule("places.search", results, {})
+        third = prefetcher.schedule("places.search", results, {})
+        prefetcher.advance()
+        next_turn = prefetcher.schedule("places.search", results, {})
+        prefetcher.close()
+        return first, second, third, next_turn
+
+    assert asyncio.run(run()) == (1, 1, 0, 1)
+
+
+def test_retired_speculation_never_reaches_the_backend() -> None:
+    import threading
+
+    from api.app.services.speculation import _run_unless_retired
+
+    calls: list = []
+    retired = threading.Event()
+    retired.set()
+
+    assert _run_unless_retired(calls.append, {"place_id": "demo-ramen"}, retired) is None
+    assert calls == []
+
+
+def test_disconnected_client_still_retires_stale_speculation() -> None:
+    runner = AgentRunner()
+    runner._sessions["s6"] = ConversationState(preferences=dict(PREFERENCES))
+
+    async def run() -> None:
+        async for _ in runner.stream_chat(ChatRequest(session_id="s6", message="ramen please")):
+            pass
+        # The follow-up does not ask for menus and is abandoned after its
+        # first event; nothing from the previous turn may stay pending.
+        stream = runner.stream_chat(ChatRequest(session_id="s6", message="no thanks"))
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert runner._prefetchers["s6"]._pending == {}
+    assert runner.speculation_stats("s6")["wasted"] == 1  # type: ignore[index]
+
+
+def test_idle_and_excess_sessions_are_evicted() -> None:
+    now = [0.0]
+    runner = AgentRunner(max_sessions=2, session_ttl_s=60, clock=lambda: now[0])
+
+    _collect(runner, ChatRequest(session_id="a", message="hi"), ChatRequest(session_id="b", message="hi"))
+    _collect(runner, ChatRequest(session_id="c", message="hi"))
+    assert set(runner._sessions) == {"b", "c"}
+
+    now[0] = 120.0
+    _collect(runner, ChatRequest(session_id="d", message="hi"))
+    assert set(runner._sessions) == {"d"}
+    assert set(runner._prefetchers) == {"d"}
@@ -0,0 +1,85 @@
+"""Tests for chat traffic recording and replay."""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")  # type: ignore
+
+from api.app.main import app
+from api.app.middlewares.recorder import ChatRecorder, ChatRecordingMiddleware, anonymise_message
+from eval.load.replay import _percentiles, asgi_transport, group_sessions, load_recording, replay
+
+
+def test_recorder_anonymises_and_replay_reproduces_sessions(tmp_path) -> None:
+    path = tmp_path / "chat.jsonl"
+    ticks = iter([0.0, 1.0, 2.5, 4.0])
+    recorder = ChatRecorder(path, salt="s", clock=lambda: next(ticks))
+    send = asgi_transport(ChatRecordingMiddleware(app, recorder))
+
+    async def drive() -> list:
+        bodies = [
+            {
+                "session_id": "alice",
+                "message": "Ramen near 94105, mail me at a@b.com",
+                "location": "94105",
+                "meta": {"ua": "x"},
+            },
+            {"session_id": "bob", "message": "Pizza please"},
+            {"session_id": "alice", "message": "What's on the menu?"},
+        ]
+        return [await send(json.dumps(body).encode("utf-8")) for body in bodies]
+
+    samples = asyncio.run(drive())
+    assert all(sample.ok and sample.ttft_s is not None for sample in samples)
+    recorder.close()
+
+    entries = load_recording(path)
+    assert [entry["t"] for entry in entries] == [1.0, 2.5, 4.0]
+    assert entries[0]["location"] == "941xx"
+    assert "alice" not in path.read_text() and "a@b.com" not in path.read_text()
+    assert "meta" not in entries[0]
+
+    sessions = group_sessions(entries)
+    assert [len(session.turns) for session in sessions] == [2, 1]
+    assert sessions[0].turns[1].gap_s == pytest.approx(3.0)
+
+    report = asyncio.run(replay(sessions, asgi_transport(app), rate_scale=100.0, think_scale=0.0))
+    assert report["requests"] == 3 and report["errors"] == 0
+    assert report["latency_ms"]["p50"] is not None
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "Book for 2024-05-01 19:00",
+        "Dinner at 2024-05-01T19:00:00Z for 4",
+        "Anything near 94105 94107",
+        "Table for 2 at 7:30 under $25",
+    ],
+)
+def test_dates_times_and_zips_survive_anonymisation(message: str) -> None:
+    assert anonymise_message(message) == message
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["call 415-555-1234", "call (415) 555 1234", "call 4155551234", "call +44 20 7946 0958"],
+)
+def test_phone_numbers_are_masked(message: str) -> None:
+    assert anonymise_message(message) == "call <phone>"
+
+
+def test_non_zip_locations_are_hashed(tmp_path) -> None:
+    recorder = ChatRecorder(tmp_path / "chat.jsonl", salt="s")
+
+    entry = recorder.anonymise({"session_id": "a", "message": "hi", "location": "12 Main St"})
+
+    assert entry is not None and entry["location"] not in (None, "12 Main St")
+
+
+def test_percentiles_use_nearest_rank() -> None:
+    assert _percentiles([0.001, 0.002])["p50"] == 1.0
+    assert _percentiles([index / 1000 for index in range(1, 11)])["p90"] == 9.0
+    assert _percentiles([index / 1000 for index in range(1, 11)])["p99"] == 10.0
@@ -0,0 +1,296 @@
+"""Replay recorded ``/chat`` sessions against the API to reproduce load.
+
+Recordings are the JSONL files written by
+``api.app.middlewares.recorder.ChatRecorder`` (or produced with
+``--synthetic``). Sessions start open-loop at their recorded offsets divided
+by ``--rate-scale``, so a slow server does not slow down the arrivals. Inside
+a session, turns run in order. Before each turn the session waits for the
+recorded gap between requests multiplied by ``--think-scale``.
+
+By default requests go straight to the in-process ASGI app. Pass ``--url``
+to target a running uvicorn server instead (requires ``httpx``). The JSON
+report gives throughput, time-to-first-chunk (TTFT), full-stream latency
+percentiles and the error rate. Use ``--label`` to tag reports so that runs
+from different builds can be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[2]
+SFT_DATA = ROOT / "data" / "sft" / "train.jsonl"
+
+FOLLOW_UPS = ("What's on the menu?", "Can you book a table for two at 7?", "Anything cheaper?")
+
+
+@dataclass
+class Turn:
+    gap_s: float
+    message: str
+    location: Optional[str] = None
+
+
+@dataclass
+class Session:
+    session: str
+    start_s: float
+    turns: List[Turn] = field(default_factory=list)
+
+
+@dataclass
+class Sample:
+    status: int
+    ttft_s: Optional[float]
+    latency_s: float
+    bytes: int
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 400
+
+
+Transport = Callable[[bytes], Awaitable[Sample]]
+
+
+def load_recording(path: Path) -> List[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def group_sessions(entries: Sequence[Dict[str, Any]]) -> List[Session]:
+    """Group recorded requests by session, keeping arrival order."""
+
+    sessions: Dict[str, Session] = {}
+    last_seen: Dict[str, float] = {}
+    for entry in sorted(entries, key=lambda item: item["t"]):
+        token = entry["session"]
+        offset = float(entry["t"])
+        session = sessions.get(token)
+        if session is None:
+            session = sessions[token] = Session(session=token, start_s=offset)
+        gap = offset - last_seen.get(token, offset)
+        last_seen[token] = offset
+        session.turns.append(Turn(gap_s=gap, message=entry["message"], location=entry.get("location")))
+    return sorted(sessions.values(), key=lambda item: item.start_s)
+
+
+def synthesize_recording(
+    sessions: int, arrival_rate: float, mean_think_s: float = 2.0, seed: int = 0
+) -> List[Dict[str, Any]]:
+    """Build a recording from SFT prompts with Poisson session arrivals."""
+
+    rng = random.Random(seed)
+    prompts = []
+    with SFT_DATA.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            messages = json.loads(line)["messages"]
+            prompts.extend(message["content"] for message in messages if message["role"] == "user")
+
+    entries: List[Dict[str, Any]] = []
+    start = 0.0
+    for index in range(sessions):
+        start += rng.expovariate(arrival_rate)
+        offset = start
+        token = f"synthetic-{index}"
+        entries.append({"session": token, "t": offset, "message": rng.choice(prompts), "location": "94105"})
+        for _ in range(rng.randint(0, 2)):
+            offset += rng.expovariate(1 / mean_think_s)
+            entries.append({"session": token, "t": offset, "message": rng.choice(FOLLOW_UPS), "location": "94105"})
+    return entries
+
+
+def asgi_transport(app: Any, path: str = "/chat") -> Transport:
+    """Send requests straight into an ASGI app, timing the first body chunk."""
+
+    async def call(body: bytes) -> Sample:
+        start = time.perf_counter()
+        status = 0
+        first: Optional[float] = None
+        received = 0
+        request_sent = False
+        done = asyncio.Event()
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status, first, received
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if chunk and first is None:
+                    first = time.perf_counter() - start
+                received += len(chunk)
+                if not message.get("more_body", False):
+                    done.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("ascii"),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadgen", 80),
+        }
+        try:
+            await app(scope, receive, send)
+        except Exception as exc:  # noqa: BLE001 - report every failure as an error sample
+            return Sample(status=status or 500, ttft_s=first, latency_s=time.perf_counter() - start, bytes=received, error=repr(exc))
+        finally:
+            done.set()
+        return Sample(status=status, ttft_s=first, latency_s=time.perf_counter() - start, bytes=received)
+
+    return call
+
+
+def http_transport(client: Any, url: str) -> Transport:
+    """Stream requests to a running server with an ``httpx.AsyncClient``."""
+
+    async def call(body: bytes) -> Sample:
+        start = time.perf_counter()
+        first: Optional[float] = None
+        received = 0
+        try:
+            async with client.stream("POST", url, content=body, headers={"content-type": "application/json"}) as response:
+                async for chunk in response.aiter_bytes():
+                    if chunk and first is None:
+                        first = time.perf_counter() - start
+                    received += len(chunk)
+                return Sample(status=response.status_code, ttft_s=first, latency_s=time.perf_counter() - start, bytes=received)
+        except Exception as exc:  # noqa: BLE001 - report every failure as an error sample
+            return Sample(status=0, ttft_s=first, latency_s=time.perf_counter() - start, bytes=received, error=repr(exc))
+
+    return call
+
+
+async def replay(
+    sessions: Sequence[Session],
+    transport: Transport,
+    rate_scale: float = 1.0,
+    think_scale: float = 1.0,
+) -> Dict[str, Any]:
+    """Replay sessions open-loop and return the aggregated report."""
+
+    run_id = uuid.uuid4().hex[:8]
+    samples: List[Sample] = []
+    origin = sessions[0].start_s if sessions else 0.0
+    started = time.perf_counter()
+
+    async def run_session(session: Session) -> None:
+        await asyncio.sleep(max(0.0, (session.start_s - origin) / rate_scale))
+        session_id = f"{run_id}-{session.session}"
+        for index, turn in enumerate(session.turns):
+            if index:
+                await asyncio.sleep(turn.gap_s * think_scale)
+            body = json.dumps({"session_id": session_id, "message": turn.message, "location": turn.location})
+            samples.append(await transport(body.encode("utf-8")))
+
+    await asyncio.gather(*(run_session(session) for session in sessions))
+    duration = time.perf_counter() - started
+    return summarise(samples, duration)
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        # Nearest-rank: the smallest value with at least q of the samples at or below it.
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000, 3)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(ordered[-1] * 1000, 3)}
+
+
+def summarise(samples: Sequence[Sample], duration_s: float) -> Dict[str, Any]:
+    ok = [sample for sample in samples if sample.ok]
+    errors = len(samples) - len(ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "duration_s": round(duration_s, 3),
+        "throughput_rps": len(ok) / duration_s if duration_s else 0.0,
+        "ttft_ms": _percentiles([sample.ttft_s for sample in ok if sample.ttft_s is not None]),
+        "latency_ms": _percentiles([sample.latency_s for sample in ok]),
+        "bytes_per_request": sum(sample.bytes for sample in ok) / len(ok) if ok else 0.0,
+    }
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.recording:
+        entries = load_recording(args.recording)
+    else:
+        entries = synthesize_recording(args.synthetic, args.arrival_rate, seed=args.seed)
+    sessions = group_sessions(entries)
+
+    if args.url:
+        import httpx  # type: ignore
+
+        async with httpx.AsyncClient(timeout=None) as client:
+            report = await replay(sessions, http_transport(client, args.url), args.rate_scale, args.think_scale)
+    else:
+        from api.app.main import app
+
+        report = await replay(sessions, asgi_transport(app), args.rate_scale, args.think_scale)
+
+    report["label"] = args.label
+    report["config"] = {
+        "source": str(args.recording) if args.recording else f"synthetic:{args.synthetic}",
+        "target": args.url or "in-process",
+        "sessions": len(sessions),
+        "rate_scale": args.rate_scale,
+        "think_scale": args.think_scale,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded chat sessions as load")
+    parser.add_argument("--recording", type=Path, help="JSONL written by ChatRecorder")
+    parser.add_argument("--synthetic", type=int, default=50, help="Sessions to synthesise when no recording is given")
+    parser.add_argument("--arrival-rate", type=float, default=20.0, help="Synthetic session arrivals per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate-scale", type=float, default=1.0, help="Multiply session arrival rate")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="Multiply in-session think times")
+    parser.add_argument("--url", help="Target a running server, e.g. http://localhost:8000/chat")
+    parser.add_argument("--label", default="local", help="Build label stored in the report")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(encoded + "\n", encoding="utf-8")
+    print(encoded)
+
+
+if __name__ == "__main__":
+    main()
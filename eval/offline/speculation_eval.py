@@ -0,0 +1,118 @@
+"""Measure follow-up-turn latency with and without speculative prefetch.
+
+Each scenario in ``eval/scenarios/speculation.yaml`` is replayed against an
+``AgentRunner`` whose tools sleep for a fixed latency to mimic remote
+backends. The report compares the follow-up turn's wall time with
+speculation on and off and includes the wasted-work ratio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agent.adk_app.planner import ConversationState
+from agent.tools import BookingTools, MenuLookupTool, PlacesSearchTool
+from api.app.schemas.chat import ChatRequest
+from api.app.services.agent_runner import AgentRunner
+
+SCENARIOS = Path(__file__).resolve().parents[1] / "scenarios" / "speculation.yaml"
+
+
+# search() and lookup() are built on the page methods, so slowing those covers
+# both the full and the paginated dispatch path.
+class _SlowPlaces(PlacesSearchTool):
+    latency_s = 0.0
+
+    def search_page(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        return super().search_page(*args, **kwargs)
+
+
+class _SlowMenus(MenuLookupTool):
+    latency_s = 0.0
+
+    def lookup_page(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        time.sleep(self.latency_s)
+        return super().lookup_page(*args, **kwargs)
+
+
+class _SlowBooking(BookingTools):
+    latency_s = 0.0
+
+    def make_deeplink(self, place_id: str, party_size: int, datetime_iso: str) -> Dict[str, str]:
+        time.sleep(self.latency_s)
+        return super().make_deeplink(place_id, party_size, datetime_iso)
+
+
+def load_scenarios(path: Path) -> List[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as handle:
+        import yaml  # type: ignore
+
+        return yaml.safe_load(handle)
+
+
+async def _run_scenario(scenario: Dict[str, Any], speculate: bool, latency_s: float, think_s: float) -> Dict[str, Any]:
+    places, menus, booking = _SlowPlaces(), _SlowMenus(), _SlowBooking()
+    for tool in (places, menus, booking):
+        tool.latency_s = latency_s
+    runner = AgentRunner(places=places, menus=menus, booking=booking, speculate=speculate)
+    session_id = scenario["name"]
+    runner._sessions[session_id] = ConversationState(preferences=dict(scenario["preferences"]))
+
+    turn_latencies: List[float] = []
+    for index, message in enumerate(scenario["turns"]):
+        if index:
+            await asyncio.sleep(think_s)
+        start = time.perf_counter()
+        async for _ in runner.stream_chat(ChatRequest(session_id=session_id, message=message)):
+            pass
+        turn_latencies.append(time.perf_counter() - start)
+
+    stats = runner.speculation_stats(session_id)
+    runner.close_session(session_id)
+    return {"follow_up_ms": sum(turn_latencies[1:]) * 1000, "speculation": stats}
+
+
+async def evaluate(latency_s: float, think_s: float) -> Dict[str, Any]:
+    report: List[Dict[str, Any]] = []
+    issued = wasted = 0
+    baseline_total = speculative_total = 0.0
+    for scenario in load_scenarios(SCENARIOS):
+        baseline = await _run_scenario(scenario, False, latency_s, think_s)
+        speculative = await _run_scenario(scenario, True, latency_s, think_s)
+        stats = speculative["speculation"] or {}
+        issued += stats.get("issued", 0)
+        wasted += stats.get("wasted", 0)
+        baseline_total += baseline["follow_up_ms"]
+        speculative_total += speculative["follow_up_ms"]
+        report.append(
+            {
+                "name": scenario["name"],
+                "baseline_follow_up_ms": round(baseline["follow_up_ms"], 2),
+                "speculative_follow_up_ms": round(speculative["follow_up_ms"], 2),
+                "speculation": stats,
+            }
+        )
+    return {
+        "scenarios": report,
+        "follow_up_latency_reduction": 1 - speculative_total / baseline_total if baseline_total else 0.0,
+        "wasted_work_ratio": wasted / issued if issued else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate speculative tool prefetch")
+    parser.add_argument("--tool-latency-ms", type=float, default=40.0)
+    parser.add_argument("--think-time-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    result = asyncio.run(evaluate(args.tool_latency_ms / 1000, args.think_time_ms / 1000))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Dict, Iterable, List
+
+from agent.adk_app.planner import TableTalkPlanner
+from training.inference import BatchConfig, BatchRunner, LocalDeterministicModel
+from training.inference.batching import parse_suggestions
 
 
 def load_cases(path: Path) -> Iterable[dict]:
@@ -14,9 +19,35 @@ def load_cases(path: Path) -> Iterable[dict]:
         return yaml.safe_load(handle)
 
 
+def case_preferences(case: Dict[str, Any]) -> Dict[str, Any]:
+    return {"diet": case.get("must_include", []), "budget": case.get("budget_max")}
+
+
+def evaluate(cases: List[Dict[str, Any]], runner: BatchRunner) -> Dict[str, Any]:
+    """Complete every case prompt in batches, then critic-score them in one pass."""
+
+    completions = runner.run_sync([case["prompt"] for case in cases])
+    scores = TableTalkPlanner().critic_score_batch(
+        [parse_suggestions(completion) for completion in completions],
+        [case_preferences(case) for case in cases],
+    )
+    return {
+        "cases": len(cases),
+        "mean_critic_score": sum(scores) / len(scores) if scores else 0.0,
+        "results": [{"name": case["name"], "critic_score": score} for case, score in zip(cases, scores)],
+    }
+
+
 def main() -> None:
-    cases = load_cases(Path(__file__).with_name("test_cases.yaml"))
-    print(json.dumps({"cases": len(cases)}))
+    parser = argparse.ArgumentParser(description="Run offline eval cases")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--checkpoint", type=Path)
+    args = parser.parse_args()
+
+    cases = list(load_cases(Path(__file__).with_name("test_cases.yaml")))
+    config = BatchConfig(batch_size=args.batch_size, max_in_flight=args.max_in_flight, checkpoint=args.checkpoint)
+    print(json.dumps(evaluate(cases, BatchRunner(LocalDeterministicModel(), config))))
 
 
 if __name__ == "__main__":
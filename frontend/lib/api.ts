@@ -3,6 +3,10 @@ export interface ChatPayload {
   message: string;
 }
 
+export interface PagePayload {
+  cursor: string;
+}
+
 export function createSessionId() {
   if (typeof window === "undefined") {
     return "demo-session";
@@ -44,3 +48,23 @@ export async function* streamChat(payload: ChatPayload, signal?: AbortSignal) {
     reader.releaseLock();
   }
 }
+
+/**
+ * Fetch the next page of a paginated `tool_result` event. Pass the event's
+ * `next_cursor`; the returned event carries its own `next_cursor` until the
+ * results run out.
+ */
+export async function fetchNextPage(payload: PagePayload, signal?: AbortSignal) {
+  const response = await fetch("/api/chat/page", {
+    method: "POST",
+    body: JSON.stringify(payload),
+    headers: { "Content-Type": "application/json" },
+    signal,
+  });
+
+  if (!response.ok) {
+    throw new Error("Failed to fetch next page");
+  }
+
+  return JSON.parse((await response.text()).trim());
+}
@@ -0,0 +1,5 @@
+"""Batched model inference for offline evaluation and training-data generation."""
+
+from .batching import BatchConfig, BatchRunner, CompletionModel, LocalDeterministicModel
+
+__all__ = ["BatchConfig", "BatchRunner", "CompletionModel", "LocalDeterministicModel"]
@@ -0,0 +1,199 @@
+"""Micro-batched, pipelined completion client.
+
+``BatchRunner`` splits prompts into micro-batches of ``batch_size`` and keeps
+up to ``max_in_flight`` batches in flight at once. A failed batch is retried
+with exponential backoff. Finished batches are appended to an optional JSONL
+checkpoint, so an interrupted run picks up where it stopped. Any object that
+implements ``CompletionModel`` can be plugged in: a Bedrock client in
+production, or ``LocalDeterministicModel`` for tests and benchmarks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Sequence
+
+from agent.tools import MenuLookupTool
+
+
+class CompletionModel(Protocol):
+    """Anything that can complete a batch of prompts in one request."""
+
+    async def complete_batch(self, prompts: Sequence[str]) -> List[str]:
+        ...
+
+
+class LocalDeterministicModel:
+    """Deterministic stand-in for a hosted model.
+
+    The completion for a prompt is a JSON list of menu items picked by
+    hashing the prompt, so critic scoring has something real to check.
+    Latency is modelled as a fixed per-request overhead plus a small
+    per-prompt cost, which is the cost shape that makes batching pay off.
+    With ``failure_rate`` set, requests fail at random (seeded), which is
+    useful for exercising retries.
+    """
+
+    def __init__(
+        self,
+        request_latency_s: float = 0.02,
+        per_prompt_latency_s: float = 0.0005,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        menus: Optional[MenuLookupTool] = None,
+    ) -> None:
+        self._request_latency_s = request_latency_s
+        self._per_prompt_latency_s = per_prompt_latency_s
+        self._failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        menus = menus or MenuLookupTool()
+        self._items = [
+            item for place_id in ("demo-ramen", "demo-pizza") for item in menus.lookup(place_id)
+        ]
+        self.requests = 0
+
+    def complete(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        picks = [self._items[byte % len(self._items)] for byte in digest[:2]]
+        return json.dumps([{"name": item["name"], "price": item["price"], "tags": item["tags"]} for item in picks])
+
+    async def complete_batch(self, prompts: Sequence[str]) -> List[str]:
+        self.requests += 1
+        await asyncio.sleep(self._request_latency_s + self._per_prompt_latency_s * len(prompts))
+        if self._failure_rate and self._rng.random() < self._failure_rate:
+            raise RuntimeError("transient model error")
+        return [self.complete(prompt) for prompt in prompts]
+
+
+@dataclass
+class BatchConfig:
+    batch_size: int = 16
+    max_in_flight: int = 4
+    max_retries: int = 3
+    backoff_s: float = 0.05
+    checkpoint: Optional[Path] = None
+
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchRunner:
+    """Run prompts through a ``CompletionModel`` in pipelined micro-batches."""
+
+    def __init__(self, model: CompletionModel, config: Optional[BatchConfig] = None) -> None:
+        self._model = model
+        self._config = config or BatchConfig()
+
+    def _load_checkpoint(self, prompts: Sequence[str]) -> Dict[int, str]:
+        path = self._config.checkpoint
+        if path is None or not path.exists():
+            return {}
+        done: Dict[int, str] = {}
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                index = record["index"]
+                # Ignore entries written for a different prompt list.
+                if index < len(prompts) and record["key"] == _prompt_key(prompts[index]):
+                    done[index] = record["completion"]
+        return done
+
+    def _write_checkpoint(self, indices: Sequence[int], prompts: Sequence[str], completions: Sequence[str]) -> None:
+        path = self._config.checkpoint
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as sink:
+            for index, completion in zip(indices, completions):
+                sink.write(json.dumps({"index": index, "key": _prompt_key(prompts[index]), "completion": completion}) + "\n")
+
+    async def _complete_with_retry(self, batch: List[str]) -> List[str]:
+        attempt = 0
+        while True:
+            try:
+                completions = await self._model.complete_batch(batch)
+            except Exception:
+                if attempt >= self._config.max_retries:
+                    raise
+                await asyncio.sleep(self._config.backoff_s * 2**attempt)
+                attempt += 1
+                continue
+            if len(completions) != len(batch):
+                raise ValueError(f"model returned {len(completions)} completions for {len(batch)} prompts")
+            return completions
+
+    async def run(self, prompts: Sequence[str]) -> List[str]:
+        """Return one completion per prompt, in input order."""
+
+        results: Dict[int, str] = self._load_checkpoint(prompts)
+        pending = [index for index in range(len(prompts)) if index not in results]
+        size = max(1, self._config.batch_size)
+        batches = [pending[start : start + size] for start in range(0, len(pending), size)]
+        gate = asyncio.Semaphore(max(1, self._config.max_in_flight))
+
+        async def run_batch(indices: List[int]) -> None:
+            async with gate:
+                completions = await self._complete_with_retry([prompts[index] for index in indices])
+            results.update(zip(indices, completions))
+            self._write_checkpoint(indices, prompts, completions)
+
+        await asyncio.gather(*(run_batch(indices) for indices in batches))
+        return [results[index] for index in range(len(prompts))]
+
+    def run_sync(self, prompts: Sequence[str]) -> List[str]:
+        return asyncio.run(self.run(prompts))
+
+
+def parse_suggestions(completion: str) -> List[Dict[str, object]]:
+    """Decode a completion into suggestion dicts; malformed output yields ``[]``."""
+
+    try:
+        decoded = json.loads(completion)
+    except ValueError:
+        return []
+    if not isinstance(decoded, list):
+        return []
+    return [item for item in decoded if isinstance(item, dict)]
+
+
+async def _serial(model: CompletionModel, prompts: Sequence[str]) -> List[str]:
+    return [(await model.complete_batch([prompt]))[0] for prompt in prompts]
+
+
+def _bench(prompt_count: int, config: BatchConfig) -> Dict[str, float]:
+    prompts = [f"Vegan ramen under ${10 + index % 20} near 94105 (#{index})" for index in range(prompt_count)]
+
+    start = time.perf_counter()
+    serial = asyncio.run(_serial(LocalDeterministicModel(), prompts))
+    serial_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = BatchRunner(LocalDeterministicModel(), config).run_sync(prompts)
+    batched_s = time.perf_counter() - start
+
+    assert serial == batched, "batched completions must match the one-at-a-time path"
+    return {
+        "prompts": prompt_count,
+        "serial_prompts_per_s": prompt_count / serial_s,
+        "batched_prompts_per_s": prompt_count / batched_s,
+        "speedup": serial_s / batched_s,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched vs one-at-a-time completion.")
+    parser.add_argument("--prompts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps(_bench(args.prompts, BatchConfig(batch_size=args.batch_size, max_in_flight=args.max_in_flight)), indent=2))
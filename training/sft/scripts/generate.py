@@ -0,0 +1,90 @@
+"""Generate candidate SFT completions in batches and critic-filter them."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict
+
+from agent.adk_app.planner import TableTalkPlanner
+from training.inference import BatchConfig, BatchRunner, LocalDeterministicModel
+from training.inference.batching import parse_suggestions
+from training.sft.scripts.prep import iter_examples
+
+
+DIETARY_TAGS = ("vegan", "vegetarian", "gluten-free", "dairy-free", "halal", "kosher")
+# Tags are matched as whole words on text whose hyphens and spaces are
+# collapsed to single spaces, so "gluten free" counts and "non-vegan" does not.
+_DIETARY = re.compile(
+    r"(?<!\bnon )(?<!\bnot )\b(" + "|".join(tag.replace("-", " ") for tag in DIETARY_TAGS) + r")\b"
+)
+_SEPARATORS = re.compile(r"[\s-]+")
+_BUDGET = re.compile(r"(?:under|below|less than|max(?:imum)?)\s*\$\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def extract_preferences(prompt: str) -> Dict[str, Any]:
+    """Pull critic constraints (dietary tags, budget) out of a user prompt."""
+
+    normalised = _SEPARATORS.sub(" ", prompt.lower())
+    found = {match.group(1).replace(" ", "-") for match in _DIETARY.finditer(normalised)}
+    preferences: Dict[str, Any] = {}
+    diet = [tag for tag in DIETARY_TAGS if tag in found]
+    if diet:
+        preferences["diet"] = diet
+    budget = _BUDGET.search(prompt)
+    if budget:
+        preferences["budget"] = float(budget.group(1))
+    return preferences
+
+
+def example_preferences(example: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+    """Use an explicit ``preferences`` field if present, else extract from the prompt."""
+
+    return example.get("preferences") or extract_preferences(prompt)
+
+
+def main(
+    source: Path, output: Path, config: BatchConfig, min_score: float, allow_unconstrained: bool = False
+) -> None:
+    examples = list(iter_examples(source))
+    prompts = [example["messages"][1]["content"] for example in examples]
+    preferences = [example_preferences(example, prompt) for example, prompt in zip(examples, prompts)]
+    unconstrained = [prompt for prompt, prefs in zip(prompts, preferences) if not prefs]
+    if unconstrained and not allow_unconstrained:
+        # With no constraints the critic passes everything, so filtering would be a no-op.
+        raise ValueError(
+            f"{len(unconstrained)} prompt(s) have no critic constraints, e.g. {unconstrained[0]!r}; "
+            "add a 'preferences' field or pass --allow-unconstrained"
+        )
+    completions = BatchRunner(LocalDeterministicModel(), config).run_sync(prompts)
+    scores = TableTalkPlanner().critic_score_batch(
+        [parse_suggestions(completion) for completion in completions],
+        preferences,
+    )
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    kept = 0
+    with output.open("w", encoding="utf-8") as sink:
+        for example, completion, score in zip(examples, completions, scores):
+            if score < min_score:
+                continue
+            messages = example["messages"][:2] + [{"role": "assistant", "content": completion}]
+            sink.write(json.dumps({"messages": messages, "critic_score": score}) + "\n")
+            kept += 1
+    print(json.dumps({"prompts": len(prompts), "kept": kept}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate SFT completions with batched inference")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--checkpoint", type=Path)
+    parser.add_argument("--min-score", type=float, default=1.0)
+    parser.add_argument("--allow-unconstrained", action="store_true", help="Keep prompts with no critic constraints")
+    args = parser.parse_args()
+    config = BatchConfig(batch_size=args.batch_size, max_in_flight=args.max_in_flight, checkpoint=args.checkpoint)
+    main(args.source, args.output, config, args.min_score, args.allow_unconstrained)
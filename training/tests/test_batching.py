@@ -0,0 +1,69 @@
+"""Tests for the batched inference runner."""
+
+import json
+from typing import List, Sequence
+
+import pytest
+
+from training.inference import BatchConfig, BatchRunner, LocalDeterministicModel
+
+
+class _Flaky:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.batches: List[List[str]] = []
+
+    async def complete_batch(self, prompts: Sequence[str]) -> List[str]:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("boom")
+        self.batches.append(list(prompts))
+        return [prompt.upper() for prompt in prompts]
+
+
+def test_batched_output_matches_serial_order() -> None:
+    model = LocalDeterministicModel(request_latency_s=0, per_prompt_latency_s=0)
+    prompts = [f"prompt {index}" for index in range(10)]
+
+    completions = BatchRunner(model, BatchConfig(batch_size=3, max_in_flight=2)).run_sync(prompts)
+
+    assert completions == [model.complete(prompt) for prompt in prompts]
+    assert model.requests == 4
+
+
+def test_retries_with_backoff_then_gives_up() -> None:
+    prompts = ["a", "b"]
+    assert BatchRunner(_Flaky(2), BatchConfig(backoff_s=0)).run_sync(prompts) == ["A", "B"]
+
+    with pytest.raises(RuntimeError):
+        BatchRunner(_Flaky(5), BatchConfig(backoff_s=0, max_retries=1)).run_sync(prompts)
+
+
+def test_checkpoint_skips_completed_prompts(tmp_path) -> None:
+    checkpoint = tmp_path / "progress.jsonl"
+    config = BatchConfig(batch_size=2, checkpoint=checkpoint)
+    BatchRunner(_Flaky(0), config).run_sync(["a", "b"])
+
+    resumed = _Flaky(0)
+    assert BatchRunner(resumed, config).run_sync(["a", "b", "c"]) == ["A", "B", "C"]
+    assert resumed.batches == [["c"]]
+    assert len([json.loads(line) for line in checkpoint.read_text().splitlines()]) == 3
+
+
+def test_generate_derives_critic_constraints_from_prompts(tmp_path) -> None:
+    from training.sft.scripts.generate import extract_preferences, main
+
+    assert extract_preferences("I need gluten-free pizza under $20 near 94105.") == {
+        "diet": ["gluten-free"],
+        "budget": 20.0,
+    }
+    assert extract_preferences("Gluten free and dairy  free, please") == {"diet": ["gluten-free", "dairy-free"]}
+    assert extract_preferences("Spicy non-vegan ramen, not vegetarian") == {}
+
+    source = tmp_path / "train.jsonl"
+    source.write_text(
+        json.dumps({"messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": "Pizza near 94105"}]})
+        + "\n"
+    )
+    with pytest.raises(ValueError):
+        main(source, tmp_path / "out.jsonl", BatchConfig(), min_score=1.0)